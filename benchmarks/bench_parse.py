@@ -0,0 +1,60 @@
+"""
+Report folder parsing: row-by-row AnnotatorStat construction vs. the batched pandas join.
+
+    python -m benchmarks.bench_parse --annotators 300 --days 90
+
+Writes a synthetic reports/ tree (every language, one folder per day) to a temp directory,
+checks both parsers produce the same rows, and prints their throughput.
+"""
+import argparse
+import tempfile
+import time
+
+from benchmarks.common import LANGUAGES, make_report_tree
+from src.process_data import iter_report_folders, parse_report_and_stats, parse_report_batch
+
+
+def row_by_row(folders: list) -> list:
+    rows = []
+    for language, folder in folders:
+        rows.extend(a.model_dump(exclude={"id"}) for a in parse_report_and_stats(language, folder))
+    return rows
+
+
+def vectorized(folders: list) -> list:
+    return parse_report_batch(folders)
+
+
+def key(row: dict):
+    return row["language"], row["report_date"], row["annotator_id"]
+
+
+def main(args):
+    with tempfile.TemporaryDirectory(prefix="av-bench-") as root:
+        reports = make_report_tree(root, args.annotators, args.days)
+        folders = sorted(iter_report_folders(reports))
+        print(f"📊 {len(folders)} report folders ({len(LANGUAGES)} languages x {args.days} days, {args.annotators} annotators each)")
+
+        results = {}
+        for name, parse in (("row-by-row", row_by_row), ("vectorized", vectorized)):
+            best = None
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                rows = parse(folders)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            results[name] = (best, rows)
+            print(f"{name:<11} {len(rows):>8} rows  {best:8.2f}s  {len(rows) / best:>10.0f} rows/s")
+
+        before, after = results["row-by-row"][1], results["vectorized"][1]
+        if sorted(before, key=key) != sorted(after, key=key):
+            raise SystemExit("❌ The two parsers disagree")
+        print(f"✅ Same {len(after)} rows, {results['row-by-row'][0] / results['vectorized'][0]:.1f}x faster")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--annotators", type=int, default=200, help="annotators per language")
+    parser.add_argument("--days", type=int, default=60, help="daily report folders per language")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per parser (best is reported)")
+    main(parser.parse_args())
@@ -0,0 +1,147 @@
+"""
+Latency and query plans of the annotator_stats read paths, legacy single-column indexes vs. composite indexes.
+
+    python -m benchmarks.bench_queries --annotators 500 --days 30
+    BENCH_DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.bench_queries --explain
+
+The target database's annotator_stats table is dropped and recreated for every scenario.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import timedelta
+
+from sqlalchemy import Date, bindparam, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import SQLModel
+
+from benchmarks.common import LANGUAGES, bench_database_url, make_engine, make_stat_rows
+from src.models import AnnotatorStat
+from src.process_data import bulk_upsert_language_stats
+
+COMPOSITE_INDEXES = [ix.name for ix in AnnotatorStat.__table__.indexes]
+LEGACY_INDEXES = {
+    "ix_annotator_stats_annotator_id": "annotator_id",
+    "ix_annotator_stats_language": "language",
+    "ix_annotator_stats_report_date": "report_date",
+}
+DATE_PARAMS = ("report_date", "start", "end")
+
+# The shapes the app actually runs: upsert lookup, dashboard reads, rollup refresh, /annotators pages
+QUERIES = {
+    "upsert lookup": """
+        SELECT * FROM annotator_stats
+        WHERE annotator_id = :annotator_id AND language = :language AND report_date = :report_date
+    """,
+    "language/day rows": """
+        SELECT * FROM annotator_stats WHERE language = :language AND report_date = :report_date
+    """,
+    "daily rollup": """
+        SELECT language, report_date, COUNT(id), SUM(minutes_recorded), SUM(files_read)
+        FROM annotator_stats
+        WHERE language = :language AND report_date BETWEEN :start AND :end
+        GROUP BY language, report_date
+    """,
+    "annotators page": """
+        SELECT * FROM annotator_stats ORDER BY report_date DESC, id DESC LIMIT 1000
+    """,
+    "annotators page (language)": """
+        SELECT * FROM annotator_stats WHERE language = :language
+        ORDER BY report_date DESC, id DESC LIMIT 1000
+    """,
+    "annotator history": """
+        SELECT * FROM annotator_stats WHERE annotator_id = :annotator_id ORDER BY report_date
+    """,
+}
+
+
+def statement(sql: str):
+    stmt = text(sql)
+    names = [name for name in DATE_PARAMS if f":{name}" in sql]
+    return stmt.bindparams(*[bindparam(name, type_=Date) for name in names]) if names else stmt
+
+
+def params_for(sql: str, rows: list) -> dict:
+    sample = rows[len(rows) // 2]
+    params = {
+        "annotator_id": sample["annotator_id"],
+        "language": sample["language"],
+        "report_date": sample["report_date"],
+        "start": sample["report_date"] - timedelta(days=7),
+        "end": sample["report_date"],
+    }
+    return {k: v for k, v in params.items() if f":{k}" in sql}
+
+
+async def build_table(engine, rows: list, legacy: bool):
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.drop_all, tables=[AnnotatorStat.__table__])
+        await conn.run_sync(SQLModel.metadata.create_all, tables=[AnnotatorStat.__table__])
+        if legacy:
+            for name in COMPOSITE_INDEXES:
+                await conn.execute(text(f"DROP INDEX {name}"))
+            for name, column in LEGACY_INDEXES.items():
+                await conn.execute(text(f"CREATE INDEX {name} ON annotator_stats ({column})"))
+
+    async with AsyncSession(engine) as db:
+        await bulk_upsert_language_stats(db, rows)
+        await db.commit()
+
+    async with engine.begin() as conn:
+        await conn.execute(text("ANALYZE"))
+
+
+async def explain(conn, sql: str, params: dict) -> str:
+    if conn.dialect.name == "postgresql":
+        prefix = "EXPLAIN (ANALYZE, BUFFERS) "
+    else:
+        prefix = "EXPLAIN QUERY PLAN "
+    result = await conn.execute(statement(prefix + sql), params)
+    return "\n".join("      " + " | ".join(str(v) for v in row) for row in result)
+
+
+async def run_scenario(engine, name: str, rows: list, legacy: bool, repeat: int, show_plans: bool) -> dict:
+    await build_table(engine, rows, legacy)
+    timings = {}
+    async with engine.connect() as conn:
+        for label, sql in QUERIES.items():
+            stmt, params = statement(sql), params_for(sql, rows)
+            await conn.execute(stmt, params)  # warm-up
+            samples = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                (await conn.execute(stmt, params)).fetchall()
+                samples.append((time.perf_counter() - start) * 1000)
+            samples.sort()
+            p50 = statistics.median(samples)
+            p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+            timings[label] = p50
+            print(f"{name:<10} {label:<28} p50 {p50:8.2f}ms  p95 {p95:8.2f}ms")
+            if show_plans:
+                print(await explain(conn, sql, params))
+    return timings
+
+
+async def main(args):
+    url = bench_database_url(args.url)
+    engine = make_engine(url)
+    rows = make_stat_rows(args.annotators, args.days)
+    print(f"📊 {len(rows)} synthetic rows ({len(LANGUAGES)} languages) on {engine.url.render_as_string(hide_password=True)}")
+
+    before = await run_scenario(engine, "legacy", rows, True, args.repeat, args.explain)
+    after = await run_scenario(engine, "composite", rows, False, args.repeat, args.explain)
+
+    for label in QUERIES:
+        print(f"{label}: {before[label] / after[label]:.1f}x")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="async SQLAlchemy URL (default: BENCH_DATABASE_URL or a temp SQLite file)")
+    parser.add_argument("--annotators", type=int, default=200, help="annotators per language")
+    parser.add_argument("--days", type=int, default=30, help="daily report folders per language")
+    parser.add_argument("--repeat", type=int, default=50, help="timed runs per query")
+    parser.add_argument("--explain", action="store_true", help="print each query's plan (EXPLAIN ANALYZE on Postgres)")
+    asyncio.run(main(parser.parse_args()))
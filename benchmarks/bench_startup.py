@@ -0,0 +1,112 @@
+"""
+Cold import time of the app (`import main`), measured in fresh interpreters.
+
+    python -m benchmarks.bench_startup --runs 5 --budget 0.3
+
+Each run imports main with outbound connections blocked, so any import-time network call (Google
+auth, GitHub, the database) fails the run. Prints the median wall time, the heaviest modules
+from `python -X importtime` and any heavy dependency that got imported eagerly.
+
+The budget covers what the app adds on top of its web and database framework: each run imports
+FRAMEWORK_MODULES first and times them separately. fastapi and sqlalchemy's asyncio extension take
+close to a second on their own on a small instance, which no change in this repo can bring down.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Imported by any FastAPI + SQLModel app; timed on their own and left out of the budget
+FRAMEWORK_MODULES = ["fastapi", "sqlalchemy.ext.asyncio", "sqlmodel"]
+
+# Only needed once a request uses them; none of these should be loaded by `import main`
+HEAVY_MODULES = ["pandas", "numpy", "openpyxl", "pyarrow", "gspread", "google.auth", "google.oauth2", "requests", "httpx"]
+
+CHILD = """
+import json, socket, sys, time
+
+def no_network(*args, **kwargs):
+    raise OSError("network access during import")
+
+socket.socket.connect = no_network
+socket.create_connection = no_network
+
+start = time.perf_counter()
+for name in %r:
+    __import__(name)
+framework = time.perf_counter() - start
+import main
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "framework": framework, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (FRAMEWORK_MODULES, HEAVY_MODULES)
+
+
+def child_env() -> dict:
+    env = dict(os.environ)
+    # Startup must not depend on credentials or a reachable database
+    for name in ("GOOGLE_CREDS_B64", "DATABASE_URL"):
+        env.pop(name, None)
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    return env
+
+
+def run_once() -> dict:
+    res = subprocess.run([sys.executable, "-c", CHILD], cwd=ROOT, env=child_env(), capture_output=True, text=True)
+    if res.returncode != 0:
+        raise SystemExit(f"❌ import main failed:\n{res.stderr.strip()}")
+    return json.loads(res.stdout.strip().splitlines()[-1])
+
+
+def heaviest_imports(top: int) -> list:
+    """(cumulative ms, module) of the slowest imports main adds to the framework, from -X importtime."""
+    code = "".join(f"import {name}; " for name in FRAMEWORK_MODULES) + "import main"
+    res = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, env=child_env(), capture_output=True, text=True)
+    rows, nested = [], []
+    for line in res.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        # Nested imports are printed before the top-level one that pulled them in
+        if depth:
+            # Two levels below main (deeper ones are already counted in their parent's cumulative time)
+            if depth <= 2:
+                nested.append((int(cumulative) / 1000, name.strip()))
+        else:
+            if name.strip() == "main":
+                rows = nested
+            nested = []
+    return sorted(rows, reverse=True)[:top]
+
+
+def main(args):
+    runs = [run_once() for _ in range(args.runs)]
+    seconds = sorted(r["seconds"] for r in runs)
+    framework = statistics.median(r["framework"] for r in runs)
+    own = statistics.median(r["seconds"] - r["framework"] for r in runs)
+    print(f"⏱️ import main: median {statistics.median(seconds):.3f}s, min {seconds[0]:.3f}s, max {seconds[-1]:.3f}s over {len(runs)} runs")
+    print(f"   framework ({', '.join(FRAMEWORK_MODULES)}) {framework:.3f}s, app {own:.3f}s")
+
+    for ms, name in heaviest_imports(args.top):
+        print(f"   {ms:8.1f}ms  {name}")
+
+    loaded = runs[-1]["loaded"]
+    if loaded:
+        print(f"⚠️ Imported eagerly: {', '.join(loaded)}")
+
+    if own > args.budget:
+        raise SystemExit(f"❌ Over the {args.budget:.2f}s import budget")
+    print(f"✅ Within the {args.budget:.2f}s import budget")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to time")
+    parser.add_argument("--budget", type=float, default=0.3, help="median seconds `import main` may add on top of the framework")
+    parser.add_argument("--top", type=int, default=10, help="slowest top-level imports to list")
+    main(parser.parse_args())
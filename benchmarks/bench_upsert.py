@@ -0,0 +1,68 @@
+"""
+Rows/sec of the webhook's AnnotatorStat ingestion: per-row SELECT + ORM write vs. bulk ON CONFLICT upsert.
+
+    python -m benchmarks.bench_upsert --annotators 200 --days 10
+    BENCH_DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.bench_upsert
+
+The target database's annotator_stats table is dropped and recreated for every scenario.
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import SQLModel
+
+from benchmarks.common import bench_database_url, make_engine, make_stat_rows
+from src.models import AnnotatorStat
+from src.process_data import bulk_upsert_language_stats, update_or_create_language_stat
+
+
+async def per_row(db: AsyncSession, rows: list):
+    for row in rows:
+        await update_or_create_language_stat(db, row["language"], row)
+    await db.commit()
+
+
+async def bulk(db: AsyncSession, rows: list):
+    await bulk_upsert_language_stats(db, rows)
+    await db.commit()
+
+
+async def run_scenario(engine, name: str, ingest, rows: list):
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.drop_all, tables=[AnnotatorStat.__table__])
+        await conn.run_sync(SQLModel.metadata.create_all, tables=[AnnotatorStat.__table__])
+
+    results = []
+    # First pass inserts every row, second pass updates every row
+    for phase in ("insert", "update"):
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            start = time.perf_counter()
+            await ingest(db, rows)
+            elapsed = time.perf_counter() - start
+        results.append((phase, elapsed))
+        print(f"{name:<10} {phase:<7} {len(rows):>8} rows  {elapsed:8.2f}s  {len(rows) / elapsed:>10.0f} rows/s")
+    return results
+
+
+async def main(args):
+    url = bench_database_url(args.url)
+    engine = make_engine(url)
+    rows = make_stat_rows(args.annotators, args.days)
+    print(f"📊 {len(rows)} synthetic rows on {engine.url.render_as_string(hide_password=True)}")
+
+    before = await run_scenario(engine, "per-row", per_row, rows)
+    after = await run_scenario(engine, "bulk", bulk, rows)
+
+    for (phase, slow), (_, fast) in zip(before, after):
+        print(f"{phase}: {slow / fast:.1f}x faster")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="async SQLAlchemy URL (default: BENCH_DATABASE_URL or a temp SQLite file)")
+    parser.add_argument("--annotators", type=int, default=100, help="annotators per language")
+    parser.add_argument("--days", type=int, default=10, help="daily report folders per language")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,74 @@
+"""Shared helpers for the scripts in benchmarks/ (synthetic data + throwaway databases)."""
+import os
+import random
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import create_async_engine
+
+LANGUAGES = ["pidgin", "yoruba", "hausa", "igbo"]
+
+
+def bench_database_url(url: str = None) -> str:
+    """Use the given URL / BENCH_DATABASE_URL, or a fresh SQLite file. Never point this at production."""
+    url = url or os.getenv("BENCH_DATABASE_URL")
+    if url:
+        return url
+    path = os.path.join(tempfile.mkdtemp(prefix="av-bench-"), "bench.db")
+    return f"sqlite+aiosqlite:///{path}"
+
+
+def make_engine(url: str):
+    connect_args = {"statement_cache_size": 0} if url.startswith("postgresql+asyncpg") else {}
+    return create_async_engine(url, connect_args=connect_args)
+
+
+def make_stat_rows(annotators_per_language: int, days: int, seed: int = 7, start: date = date(2025, 6, 1)) -> list:
+    """One row per annotator per language per day, shaped like AnnotatorStat.dict(exclude={'id'})."""
+    rng = random.Random(seed)
+    rows = []
+    for language in LANGUAGES:
+        for n in range(annotators_per_language):
+            annotator_id = f"{language[:2].upper()}{n:05d}"
+            for d in range(days):
+                started = rng.random() > 0.1
+                files_read = rng.randint(0, 600) if started else 0
+                rows.append({
+                    "annotator_id": annotator_id,
+                    "name": f"Annotator {annotator_id}",
+                    "language": language,
+                    "report_date": start + timedelta(days=d),
+                    "files_read": files_read,
+                    "remaining_texts": 600 - files_read,
+                    "minutes_recorded": round(files_read * rng.uniform(0.1, 0.2), 2),
+                    "has_started": started,
+                    "created_at": date.today(),
+                })
+    return rows
+
+
+def make_report_tree(root: Path, annotators_per_language: int, days: int, seed: int = 7, start: date = date(2025, 6, 1)) -> Path:
+    """Write reports/<language>/<YYYYMMDD>/{report.txt,stats.csv} like dsn-voice's; returns the reports folder."""
+    rng = random.Random(seed)
+    reports = Path(root) / "reports"
+    for language in LANGUAGES:
+        for d in range(days):
+            folder = reports / language / (start + timedelta(days=d)).strftime("%Y%m%d")
+            folder.mkdir(parents=True, exist_ok=True)
+            report_lines = [f"Daily report for {language}", ""]
+            stats_lines = ["ID,Name,Files Read,Remaining Texts,Minutes Recorded"]
+            for n in range(annotators_per_language):
+                annotator_id = f"{language[:2].upper()}{n:05d}"
+                name = f"Annotator {annotator_id}"
+                started = rng.random() > 0.1
+                if not started:
+                    report_lines += [f"ID: {annotator_id}", f"Name: {name}", "Has not started recording", ""]
+                # A few not-started annotators still show up in stats.csv, as in the real reports
+                if started or rng.random() < 0.2:
+                    files_read = rng.randint(0, 600)
+                    minutes = round(files_read * rng.uniform(0.1, 0.2), 2)
+                    stats_lines.append(f"{annotator_id},{name},{files_read},{600 - files_read},{minutes}")
+            (folder / "report.txt").write_text("\n".join(report_lines), encoding="utf-8")
+            (folder / "stats.csv").write_text("\n".join(stats_lines) + "\n", encoding="utf-8")
+    return reports
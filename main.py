@@ -1,8 +1,10 @@
 from src.routes import github_router
 from src.utils.hourly import hourly
 from src.stats_to_sheet import stats_router
+from src.jobs import jobs_router, job_runner
 from fastapi import FastAPI
-import uvicorn,os
+import os
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi.requests import Request
 from typing import cast
@@ -12,7 +14,10 @@ from dotenv import load_dotenv
 from src.middleware import register_middleware
 from src.errors import register_all_errors
 # from src.utils.audio_data_summary_folder.audio_summary import audio_data
-from src.db import create_tables
+from src.db import create_tables, async_session_maker
+from src.process_data import ensure_daily_summaries, shutdown_parse_pool
+from src.utils.report_source import close_async_client
+from src.utils.report_index import report_index
 
 load_dotenv()
 
@@ -31,9 +36,21 @@ version_prefix = f"/api/{version}"
 async def lifespan(app: FastAPI):
 
     await create_tables()
+    async with async_session_maker() as db:
+        await ensure_daily_summaries(db)
+    await job_runner.start()
+    try:
+        await asyncio.to_thread(report_index.build)
+    except Exception as e:
+        # Not fatal: the index is built again on first use
+        print(f"⚠️ Could not index reports at startup: {e}")
 
     yield
 
+    await job_runner.stop()
+    shutdown_parse_pool()
+    await close_async_client()
+
 
 app = FastAPI(
     lifespan=lifespan,
@@ -88,6 +105,11 @@ app.include_router(
     tags=["Stats to Google Sheets"]
 )
 
+app.include_router(
+    jobs_router,
+    tags=["Background Jobs"]
+)
+
 # if __name__ == "__main__":
 #     uvicorn.run(
 #         app="main:app",
@@ -103,6 +125,8 @@ if __name__ == "__main__":
     PORT = int(os.getenv("PORT", 10000))
     HOST = "0.0.0.0" if ENV == "production" else "localhost"
 
+    import uvicorn
+
     uvicorn.run(
         app="main:app",
         host="0.0.0.0",
@@ -0,0 +1,58 @@
+"""create language daily summary table
+
+Revision ID: 08346491a9b9
+Revises: ece82c2d7608
+Create Date: 2026-10-18 13:40:17.204881
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '08346491a9b9'
+down_revision: Union[str, Sequence[str], None] = 'ece82c2d7608'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    # The app's create_tables() makes it on startup, possibly before this migration runs
+    if not inspector.has_table('language_daily_summary'):
+        op.create_table('language_daily_summary',
+        sa.Column('language', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('report_date', sa.Date(), nullable=False),
+        sa.Column('annotator_count', sa.Integer(), nullable=False),
+        sa.Column('total_minutes', sa.Float(), nullable=False),
+        sa.Column('total_files_read', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('language', 'report_date')
+        )
+
+    # Backfill from the existing per-annotator rows, leaving days the app has already rolled up alone
+    if inspector.has_table('annotator_stats'):
+        op.execute(
+            """
+            INSERT INTO language_daily_summary
+                (language, report_date, annotator_count, total_minutes, total_files_read, updated_at)
+            SELECT s.language, s.report_date, COUNT(s.id),
+                   COALESCE(SUM(s.minutes_recorded), 0), COALESCE(SUM(s.files_read), 0), CURRENT_TIMESTAMP
+            FROM annotator_stats s
+            WHERE NOT EXISTS (
+                SELECT 1 FROM language_daily_summary d
+                WHERE d.language = s.language AND d.report_date = s.report_date
+            )
+            GROUP BY s.language, s.report_date
+            """
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if sa.inspect(op.get_bind()).has_table('language_daily_summary'):
+        op.drop_table('language_daily_summary')
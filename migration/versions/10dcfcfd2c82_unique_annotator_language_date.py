@@ -0,0 +1,49 @@
+"""unique annotator/language/report_date on annotator_stats
+
+Revision ID: 10dcfcfd2c82
+Revises: 414c3f11db90
+Create Date: 2026-10-18 09:12:31.418207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '10dcfcfd2c82'
+down_revision: Union[str, Sequence[str], None] = '414c3f11db90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = 'annotator_stats'
+CONSTRAINT = 'uq_annotator_stats_annotator_language_date'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The app creates annotator_stats itself on startup; nothing to do on a database that never ran it
+    if not sa.inspect(op.get_bind()).has_table(TABLE):
+        return
+
+    # Keep only the newest row per (annotator_id, language, report_date) before enforcing uniqueness
+    op.execute(
+        f"""
+        DELETE FROM {TABLE}
+        WHERE id NOT IN (
+            SELECT MAX(id) FROM {TABLE} GROUP BY annotator_id, language, report_date
+        )
+        """
+    )
+    with op.batch_alter_table(TABLE) as batch_op:
+        batch_op.create_unique_constraint(CONSTRAINT, ['annotator_id', 'language', 'report_date'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if not sa.inspect(op.get_bind()).has_table(TABLE):
+        return
+
+    with op.batch_alter_table(TABLE) as batch_op:
+        batch_op.drop_constraint(CONSTRAINT, type_='unique')
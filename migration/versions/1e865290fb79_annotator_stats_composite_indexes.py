@@ -0,0 +1,110 @@
+"""composite indexes on annotator_stats, retire the legacy annotatorstat table
+
+Revision ID: 1e865290fb79
+Revises: 08346491a9b9
+Create Date: 2026-10-18 16:52:08.611934
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1e865290fb79'
+down_revision: Union[str, Sequence[str], None] = '08346491a9b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = 'annotator_stats'
+LEGACY_TABLE = 'annotatorstat'
+UNIQUE = 'uq_annotator_stats_annotator_language_date'
+COLUMNS = 'annotator_id, name, language, report_date, files_read, remaining_texts, minutes_recorded, has_started, created_at'
+
+# Serve WHERE language = ? AND report_date ... (rollups, per-language pages) and the
+# ORDER BY report_date DESC, id DESC keyset on /annotators. Point lookups by
+# (annotator_id, language, report_date) already use the unique constraint's index.
+COMPOSITE_INDEXES = {
+    'ix_annotator_stats_language_report_date': ['language', 'report_date', 'id'],
+    'ix_annotator_stats_report_date_id': ['report_date', 'id'],
+}
+# Leading columns of the composites / unique constraint, so only extra write cost
+SINGLE_COLUMN_INDEXES = {
+    'ix_annotator_stats_annotator_id': ['annotator_id'],
+    'ix_annotator_stats_language': ['language'],
+    'ix_annotator_stats_report_date': ['report_date'],
+}
+
+
+def _index_names(table: str) -> set:
+    return {ix['name'] for ix in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def _create_indexes(indexes: dict):
+    existing = _index_names(TABLE)
+    concurrently = op.get_bind().dialect.name == 'postgresql'
+    for name, columns in indexes.items():
+        if name in existing:
+            continue
+        if concurrently:
+            # Don't block ingestion on a large table while the index builds
+            with op.get_context().autocommit_block():
+                op.create_index(name, TABLE, columns, postgresql_concurrently=True)
+        else:
+            op.create_index(name, TABLE, columns)
+
+
+def _drop_indexes(table: str, names):
+    existing = _index_names(table)
+    for name in names:
+        if name in existing:
+            op.drop_index(name, table_name=table)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+
+    # 414c3f11db90 created "annotatorstat" while the model (and create_tables) use "annotator_stats"
+    if inspector.has_table(LEGACY_TABLE):
+        _drop_indexes(LEGACY_TABLE, [f'ix_{LEGACY_TABLE}_{c}' for c in ('annotator_id', 'language', 'report_date')])
+        if not inspector.has_table(TABLE):
+            op.rename_table(LEGACY_TABLE, TABLE)
+            op.execute(
+                f"""
+                DELETE FROM {TABLE}
+                WHERE id NOT IN (
+                    SELECT MAX(id) FROM {TABLE} GROUP BY annotator_id, language, report_date
+                )
+                """
+            )
+            with op.batch_alter_table(TABLE) as batch_op:
+                batch_op.create_unique_constraint(UNIQUE, ['annotator_id', 'language', 'report_date'])
+        else:
+            # Both exist: the app already created annotator_stats on startup. Keep its rows, bring over the rest.
+            op.execute(
+                f"""
+                INSERT INTO {TABLE} ({COLUMNS})
+                SELECT {COLUMNS} FROM {LEGACY_TABLE}
+                WHERE id IN (SELECT MAX(id) FROM {LEGACY_TABLE} GROUP BY annotator_id, language, report_date)
+                ON CONFLICT (annotator_id, language, report_date) DO NOTHING
+                """
+            )
+            op.drop_table(LEGACY_TABLE)
+
+    if not sa.inspect(op.get_bind()).has_table(TABLE):
+        return
+
+    _create_indexes(COMPOSITE_INDEXES)
+    _drop_indexes(TABLE, SINGLE_COLUMN_INDEXES)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The legacy annotatorstat table is not brought back
+    if not sa.inspect(op.get_bind()).has_table(TABLE):
+        return
+
+    _create_indexes(SINGLE_COLUMN_INDEXES)
+    _drop_indexes(TABLE, COMPOSITE_INDEXES)
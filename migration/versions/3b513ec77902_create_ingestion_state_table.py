@@ -0,0 +1,39 @@
+"""create ingestion state table
+
+Revision ID: 3b513ec77902
+Revises: 10dcfcfd2c82
+Create Date: 2026-10-18 10:02:54.913368
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b513ec77902'
+down_revision: Union[str, Sequence[str], None] = '10dcfcfd2c82'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The app's create_tables() makes it on startup, possibly before this migration runs
+    if sa.inspect(op.get_bind()).has_table('ingestion_state'):
+        return
+
+    op.create_table('ingestion_state',
+    sa.Column('source', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('commit_sha', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('source')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if sa.inspect(op.get_bind()).has_table('ingestion_state'):
+        op.drop_table('ingestion_state')
@@ -0,0 +1,42 @@
+"""sync jobs lease columns
+
+Revision ID: 5c2f7a9d1e43
+Revises: 1e865290fb79
+Create Date: 2026-10-19 09:12:40.218311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2f7a9d1e43'
+down_revision: Union[str, Sequence[str], None] = '1e865290fb79'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _column_names() -> set:
+    return {c['name'] for c in sa.inspect(op.get_bind()).get_columns('sync_jobs')}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A sync_jobs table made by the app's create_tables() already has both columns
+    existing = _column_names()
+    if 'claimed_by' not in existing:
+        op.add_column('sync_jobs', sa.Column('claimed_by', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    if 'lease_until' not in existing:
+        op.add_column('sync_jobs', sa.Column('lease_until', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    existing = _column_names()
+    with op.batch_alter_table('sync_jobs') as batch_op:
+        for name in ('lease_until', 'claimed_by'):
+            if name in existing:
+                batch_op.drop_column(name)
@@ -0,0 +1,50 @@
+"""timezone-aware updated_at on ingestion_state and language_daily_summary
+
+Revision ID: b7e3f19a4c68
+Revises: 5c2f7a9d1e43
+Create Date: 2026-10-19 14:05:12.604917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e3f19a4c68'
+down_revision: Union[str, Sequence[str], None] = '5c2f7a9d1e43'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = [('ingestion_state', 'updated_at'), ('language_daily_summary', 'updated_at')]
+
+
+def _set_timezone(timezone: bool) -> None:
+    # SQLite keeps datetimes as text either way; only Postgres has a separate timestamptz type
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    inspector = sa.inspect(bind)
+    for table, column in COLUMNS:
+        if not inspector.has_table(table):
+            continue
+        current = next(c['type'] for c in inspector.get_columns(table) if c['name'] == column)
+        if bool(getattr(current, 'timezone', False)) == timezone:
+            continue
+        # Existing values were written as naive UTC
+        op.alter_column(
+            table, column,
+            type_=sa.DateTime(timezone=timezone),
+            postgresql_using=f"{column} AT TIME ZONE 'UTC'",
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _set_timezone(True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _set_timezone(False)
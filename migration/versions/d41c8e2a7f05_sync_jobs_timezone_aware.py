@@ -0,0 +1,50 @@
+"""timezone-aware timestamps on sync_jobs
+
+Revision ID: d41c8e2a7f05
+Revises: b7e3f19a4c68
+Create Date: 2026-10-19 14:21:47.381052
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41c8e2a7f05'
+down_revision: Union[str, Sequence[str], None] = 'b7e3f19a4c68'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = [('sync_jobs', column) for column in ('created_at', 'started_at', 'finished_at', 'lease_until')]
+
+
+def _set_timezone(timezone: bool) -> None:
+    # SQLite keeps datetimes as text either way; only Postgres has a separate timestamptz type
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    inspector = sa.inspect(bind)
+    for table, column in COLUMNS:
+        if not inspector.has_table(table):
+            continue
+        current = next(c['type'] for c in inspector.get_columns(table) if c['name'] == column)
+        if bool(getattr(current, 'timezone', False)) == timezone:
+            continue
+        # Existing values were written as naive UTC
+        op.alter_column(
+            table, column,
+            type_=sa.DateTime(timezone=timezone),
+            postgresql_using=f"{column} AT TIME ZONE 'UTC'",
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _set_timezone(True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _set_timezone(False)
@@ -0,0 +1,67 @@
+"""create sync jobs table
+
+Revision ID: ece82c2d7608
+Revises: 3b513ec77902
+Create Date: 2026-10-18 11:26:08.530961
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ece82c2d7608'
+down_revision: Union[str, Sequence[str], None] = '3b513ec77902'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE = sa.text("status IN ('queued', 'running')")
+
+
+def _index_names() -> set:
+    return {ix['name'] for ix in sa.inspect(op.get_bind()).get_indexes('sync_jobs')}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The app's create_tables() makes it on startup, possibly before this migration runs
+    if sa.inspect(op.get_bind()).has_table('sync_jobs'):
+        existing = _index_names()
+    else:
+        existing = set()
+        op.create_table('sync_jobs',
+        sa.Column('id', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('kind', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('params', sa.JSON(), nullable=True),
+        sa.Column('dedupe_key', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('status', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('progress', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('error', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+    if 'ix_sync_jobs_kind' not in existing:
+        op.create_index(op.f('ix_sync_jobs_kind'), 'sync_jobs', ['kind'], unique=False)
+    if 'ix_sync_jobs_status' not in existing:
+        op.create_index(op.f('ix_sync_jobs_status'), 'sync_jobs', ['status'], unique=False)
+    if 'uq_sync_jobs_active_dedupe_key' not in existing:
+        op.create_index('uq_sync_jobs_active_dedupe_key', 'sync_jobs', ['dedupe_key'], unique=True,
+                        postgresql_where=ACTIVE, sqlite_where=ACTIVE)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if not sa.inspect(op.get_bind()).has_table('sync_jobs'):
+        return
+
+    existing = _index_names()
+    for name in ('uq_sync_jobs_active_dedupe_key', 'ix_sync_jobs_status', 'ix_sync_jobs_kind'):
+        if name in existing:
+            op.drop_index(name, table_name='sync_jobs')
+    op.drop_table('sync_jobs')
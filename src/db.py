@@ -1,33 +1,47 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlmodel import SQLModel
-from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 import os
+import threading
 from dotenv import load_dotenv
 
 load_dotenv()
 
 DATABASE_URL = os.environ.get("DATABASE_URL")
 
-# Create async engine
-engine = create_async_engine(
-    DATABASE_URL,
-    echo=False,
-    pool_pre_ping=True,
-    connect_args={"statement_cache_size": 0}
-)
-print("✅ Engine created with statement_cache_size=0")
+_engine = None
+_session_factory = None
+_lock = threading.Lock()
 
 
-# Async session factory
-async_session_maker = sessionmaker(
-    bind=engine, class_=AsyncSession, expire_on_commit=False
-)
+# Create the async engine on first use, so importing the app needs neither DATABASE_URL nor the driver
+def get_engine() -> AsyncEngine:
+    global _engine, _session_factory
+    if _engine is None:
+        with _lock:
+            if _engine is None:
+                _engine = create_async_engine(
+                    DATABASE_URL,
+                    echo=False,
+                    pool_pre_ping=True,
+                    connect_args={"statement_cache_size": 0}
+                )
+                _session_factory = sessionmaker(
+                    bind=_engine, class_=AsyncSession, expire_on_commit=False
+                )
+                print("✅ Engine created with statement_cache_size=0")
+    return _engine
+
+
+# Async session factory (same call as a sessionmaker: `async with async_session_maker() as db`)
+def async_session_maker(**kwargs) -> AsyncSession:
+    get_engine()
+    return _session_factory(**kwargs)
 
 # Create tables asynchronously
 async def create_tables():
-    async with engine.begin() as conn:
+    async with get_engine().begin() as conn:
         await conn.run_sync(SQLModel.metadata.create_all)
 
 # Async generator for dependency injection
@@ -0,0 +1,217 @@
+import os
+import json
+import socket
+import asyncio
+import traceback
+from uuid import uuid4
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.db import async_session_maker, get_session
+from src.models import SyncJob, utc_now
+
+
+# Jobs executed concurrently by this process
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# How often idle workers look for jobs queued by other processes or left over from a restart
+POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "5"))
+# A running job whose lease isn't renewed for this long belongs to a dead process and is requeued
+LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "120"))
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+class JobRunner:
+    """
+    In-process background runner for long sheet syncs, persisted in the sync_jobs table.
+    Handlers are plain sync functions taking a `progress` callback; they run in worker threads.
+
+    A claimed job carries this runner's id and a lease that a heartbeat keeps extending, so other
+    processes (restarts, scale-out) only take over jobs whose owner stopped renewing them.
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS, lease_seconds: float = LEASE_SECONDS):
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self.handlers: Dict[str, Callable] = {}
+        self._wakeup = asyncio.Event()
+        self._tasks = []
+
+    def register(self, kind: str, handler: Callable):
+        self.handlers[kind] = handler
+        return handler
+
+    async def submit(self, kind: str, params: Optional[dict] = None) -> Tuple[SyncJob, bool]:
+        """Queue a job, or return the identical job already queued/running. Returns (job, created)."""
+        if kind not in self.handlers:
+            raise KeyError(f"Unknown job kind: {kind}")
+
+        params = params or {}
+        dedupe_key = f"{kind}:{json.dumps(params, sort_keys=True)}"
+
+        async with async_session_maker() as db:
+            existing = await self._active_job(db, dedupe_key)
+            if existing:
+                return existing, False
+
+            job = SyncJob(kind=kind, params=params, dedupe_key=dedupe_key)
+            db.add(job)
+            try:
+                await db.commit()
+            except IntegrityError:
+                # Another request (or process) queued the same job first
+                await db.rollback()
+                existing = await self._active_job(db, dedupe_key)
+                if existing:
+                    return existing, False
+                raise
+
+        self._wakeup.set()
+        return job, True
+
+    async def start(self):
+        # Jobs left running by a process that died are picked up again; live ones keep their owner
+        await self._requeue_expired()
+
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        print(f"🧵 Job runner started with {self.workers} workers")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _active_job(self, db: AsyncSession, dedupe_key: str) -> Optional[SyncJob]:
+        result = await db.execute(
+            select(SyncJob).where(SyncJob.dedupe_key == dedupe_key, SyncJob.status.in_(ACTIVE_STATUSES))
+        )
+        return result.scalars().first()
+
+    def _lease(self) -> datetime:
+        return utc_now() + timedelta(seconds=self.lease_seconds)
+
+    async def _requeue_expired(self):
+        now = utc_now()
+        expired = or_(
+            SyncJob.lease_until < now,
+            # Claimed before leases existed: only trust it for one lease period after it started
+            and_(SyncJob.lease_until.is_(None), SyncJob.started_at < now - timedelta(seconds=self.lease_seconds)),
+        )
+        async with async_session_maker() as db:
+            result = await db.execute(
+                update(SyncJob)
+                .where(SyncJob.status == "running", expired)
+                .values(status="queued", started_at=None, claimed_by=None, lease_until=None)
+            )
+            await db.commit()
+        if result.rowcount:
+            print(f"♻️ Requeued {result.rowcount} jobs whose runner stopped renewing its lease")
+
+    async def _claim_next(self) -> Optional[SyncJob]:
+        async with async_session_maker() as db:
+            result = await db.execute(
+                select(SyncJob.id).where(SyncJob.status == "queued").order_by(SyncJob.created_at).limit(10)
+            )
+            for job_id in result.scalars().all():
+                claimed = await db.execute(
+                    update(SyncJob)
+                    .where(SyncJob.id == job_id, SyncJob.status == "queued")
+                    .values(status="running", started_at=utc_now(), claimed_by=self.worker_id, lease_until=self._lease())
+                )
+                await db.commit()
+                if claimed.rowcount == 1:
+                    return await db.get(SyncJob, job_id)
+        return None
+
+    async def _update(self, job_id: str, **values) -> bool:
+        # Only while we still hold the job: after losing the lease another runner owns it
+        async with async_session_maker() as db:
+            result = await db.execute(
+                update(SyncJob).where(SyncJob.id == job_id, SyncJob.claimed_by == self.worker_id).values(**values)
+            )
+            await db.commit()
+        return result.rowcount == 1
+
+    async def _heartbeat(self, job_id: str):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                if not await self._update(job_id, lease_until=self._lease()):
+                    print(f"⚠️ Lost the lease on job {job_id}")
+                    return
+            except Exception as e:
+                print(f"❌ Could not renew the lease on job {job_id}: {e}")
+
+    async def _worker(self):
+        while True:
+            try:
+                job = await self._claim_next()
+            except Exception as e:
+                print(f"❌ Could not claim a job: {e}")
+                job = None
+
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    # Idle: also recover jobs of runners that died since we started
+                    try:
+                        await self._requeue_expired()
+                    except Exception as e:
+                        print(f"❌ Could not requeue expired jobs: {e}")
+                self._wakeup.clear()
+                continue
+
+            await self._run(job)
+
+    async def _run(self, job: SyncJob):
+        handler = self.handlers.get(job.kind)
+        if handler is None:
+            await self._update(job.id, status="failed", error=f"Unknown job kind: {job.kind}", finished_at=utc_now())
+            return
+
+        loop = asyncio.get_running_loop()
+
+        def progress(message: str):
+            # Called from the worker thread
+            asyncio.run_coroutine_threadsafe(self._update(job.id, progress=str(message)), loop)
+
+        print(f"▶️ Running job {job.id} ({job.kind})")
+        heartbeat = asyncio.create_task(self._heartbeat(job.id))
+        try:
+            result = await asyncio.to_thread(handler, progress=progress, **(job.params or {}))
+            await self._update(job.id, status="succeeded", result=jsonable_encoder(result), finished_at=utc_now(), lease_until=None)
+            print(f"✅ Job {job.id} ({job.kind}) finished")
+        except Exception as e:
+            traceback.print_exc()
+            await self._update(job.id, status="failed", error=str(e), finished_at=utc_now(), lease_until=None)
+        finally:
+            heartbeat.cancel()
+
+
+job_runner = JobRunner()
+
+jobs_router = APIRouter()
+
+
+def job_accepted(job: SyncJob, created: bool) -> dict:
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "deduplicated": not created,
+        "status_url": f"/jobs/{job.id}",
+    }
+
+
+@jobs_router.get("/jobs/{job_id}", response_model=SyncJob)
+async def get_job(job_id: str, db: AsyncSession = Depends(get_session)):
+    job = await db.get(SyncJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return job
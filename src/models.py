@@ -1,14 +1,30 @@
 from sqlmodel import SQLModel, Field
-from typing import Optional
-from datetime import date
+from sqlalchemy import JSON, Column, Index, UniqueConstraint, text
+from typing import Any, Optional
+from uuid import uuid4
+from datetime import date, datetime, timezone
+
+
+def utc_now() -> datetime:
+    """Timezone-aware UTC now; sqlmodel's datetime columns reject naive values."""
+    return datetime.now(timezone.utc)
+
 
 class AnnotatorStat(SQLModel, table=True):
     __tablename__ = "annotator_stats"
+    __table_args__ = (
+        # Also the index behind upsert lookups and per-annotator history
+        UniqueConstraint("annotator_id", "language", "report_date", name="uq_annotator_stats_annotator_language_date"),
+        # Per-language/per-day reads and rollups, incl. the /annotators keyset filtered by language
+        Index("ix_annotator_stats_language_report_date", "language", "report_date", "id"),
+        # /annotators keyset: ORDER BY report_date DESC, id DESC
+        Index("ix_annotator_stats_report_date_id", "report_date", "id"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
-    annotator_id: str = Field(index=True)
+    annotator_id: str
     name: str
-    language: str = Field(index=True)
-    report_date: date = Field(index=True)
+    language: str
+    report_date: date
 
     files_read: int = 0
     remaining_texts: int = 0
@@ -18,3 +34,50 @@ class AnnotatorStat(SQLModel, table=True):
 
     created_at: Optional[date] = Field(default_factory=date.today)
 
+
+class LanguageDailySummary(SQLModel, table=True):
+    """Per-language, per-day rollup of annotator_stats, maintained by the ingestion path."""
+    __tablename__ = "language_daily_summary"
+    language: str = Field(primary_key=True)
+    report_date: date = Field(primary_key=True)
+    annotator_count: int = 0
+    total_minutes: float = 0.0
+    total_files_read: int = 0
+    updated_at: datetime = Field(default_factory=utc_now)
+
+
+class IngestionState(SQLModel, table=True):
+    """Last dsn-voice commit whose reports have been ingested, per source."""
+    __tablename__ = "ingestion_state"
+    source: str = Field(primary_key=True)
+    commit_sha: str
+    updated_at: datetime = Field(default_factory=utc_now)
+
+
+class SyncJob(SQLModel, table=True):
+    """A long-running sheet sync executed by the in-process job runner."""
+    __tablename__ = "sync_jobs"
+    __table_args__ = (
+        # At most one queued/running job per dedupe key, even across worker processes
+        Index(
+            "uq_sync_jobs_active_dedupe_key", "dedupe_key", unique=True,
+            postgresql_where=text("status IN ('queued', 'running')"),
+            sqlite_where=text("status IN ('queued', 'running')"),
+        ),
+    )
+    id: str = Field(default_factory=lambda: uuid4().hex, primary_key=True)
+    kind: str = Field(index=True)
+    params: Optional[dict] = Field(default=None, sa_column=Column(JSON))
+    dedupe_key: str
+    status: str = Field(default="queued", index=True)  # queued | running | succeeded | failed
+    progress: Optional[str] = None
+    result: Optional[Any] = Field(default=None, sa_column=Column(JSON))
+    error: Optional[str] = None
+
+    created_at: datetime = Field(default_factory=utc_now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    # Which runner process holds the job, and until when; renewed by its heartbeat while it runs
+    claimed_by: Optional[str] = None
+    lease_until: Optional[datetime] = None
@@ -1,15 +1,25 @@
-import pandas as pd
-from datetime import datetime
+import os
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime
 from pathlib import Path
-from typing import List
-from src.models import AnnotatorStat
+from typing import AsyncIterator, Iterable, Iterator, List, Optional, Tuple
+from src.models import AnnotatorStat, IngestionState, LanguageDailySummary, utc_now
+from src.utils.lazy import lazy_import
 from sqlalchemy.orm import Session
 from sqlmodel import select
+from sqlalchemy import func
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from src.models import AnnotatorStat
 
 from src.models import AnnotatorStat 
 
+pd = lazy_import("pandas")
+
 
 def parse_report_and_stats(language: str, folder_path: Path) -> List[AnnotatorStat]:
     report_txt = folder_path / "report.txt"
@@ -69,8 +79,113 @@ def parse_report_and_stats(language: str, folder_path: Path) -> List[AnnotatorSt
     return list(annotators.values())
 
 
-def process_all_languages(base_path: Path) -> List[AnnotatorStat]:
-    all_stats = []
+# Processes parsing report folders in the webhook; 1 parses in a thread of the server process
+PARSE_WORKERS = int(os.getenv("REPORT_PARSE_WORKERS", str(os.cpu_count() or 1)))
+# Folders handed to a worker at a time
+PARSE_CHUNK_FOLDERS = int(os.getenv("REPORT_PARSE_CHUNK", "32"))
+
+# stats.csv column -> AnnotatorStat field
+STATS_COLUMNS = {
+    "Files Read": "files_read",
+    "Remaining Texts": "remaining_texts",
+    "Minutes Recorded": "minutes_recorded",
+}
+ROW_FIELDS = [
+    "annotator_id", "name", "language", "report_date", "files_read",
+    "remaining_texts", "minutes_recorded", "has_started", "created_at",
+]
+
+
+def parse_not_started(report_txt: Path) -> dict:
+    """annotator_id -> name for the entries listed as "has not started" in report.txt (last one wins)."""
+    not_started = {}
+    current_id = current_name = None
+    with open(report_txt, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("ID:"):
+                current_id = line.replace("ID:", "").strip()
+            elif line.startswith("Name:"):
+                current_name = line.replace("Name:", "").strip()
+            elif line.lower().startswith("has not started") and current_id and current_name:
+                not_started[current_id] = current_name
+    return not_started
+
+
+def read_stats_csv(stats_csv: Path) -> "pd.DataFrame":
+    df = pd.read_csv(stats_csv)
+    if "ID" not in df:
+        raise KeyError(f"{stats_csv} has no 'ID' column")
+    if "Name" not in df:
+        df = df.assign(Name="Unknown")
+    return df
+
+
+def parse_report_batch(folders: Iterable[Tuple[str, Path]]) -> List[dict]:
+    """
+    Vectorized parse_report_and_stats for many folders at once: every stats.csv is concatenated and
+    joined with the "has not started" entries of the report.txt files in a single pandas merge, and
+    the result comes back as plain dicts shaped for bulk_upsert_language_stats (no per-row model
+    validation). Semantics match the row-by-row parser: not-started annotators keep their report.txt
+    name and has_started=False even when stats.csv has numbers for them; for an ID repeated in
+    stats.csv the first row names it and the last row's numbers win. Unparseable numbers count as 0.
+    """
+    keys = ["language", "report_date", "annotator_id"]
+    not_started, stats_frames, stats_keys = [], [], []
+
+    for language, folder in folders:
+        report_date = datetime.strptime(folder.name, "%Y%m%d").date()
+        report_txt = folder / "report.txt"
+        stats_csv = folder / "stats.csv"
+        if report_txt.exists():
+            not_started.extend(
+                (language, report_date, annotator_id, name)
+                for annotator_id, name in parse_not_started(report_txt).items()
+            )
+        if stats_csv.exists():
+            stats_frames.append(read_stats_csv(stats_csv))
+            stats_keys.append((language, report_date))
+
+    left = pd.DataFrame(not_started, columns=keys + ["name"], dtype=object)
+
+    if stats_frames:
+        raw = pd.concat(stats_frames, keys=stats_keys, names=["language", "report_date", None]).reset_index(level=[0, 1])
+        stats = pd.DataFrame({
+            "language": raw["language"].to_numpy(dtype=object),
+            "report_date": raw["report_date"].to_numpy(dtype=object),
+            "annotator_id": raw["ID"].map(str).str.strip().to_numpy(dtype=object),
+            "stats_name": raw["Name"].map(str).to_numpy(dtype=object),
+        })
+        for column, field in STATS_COLUMNS.items():
+            stats[field] = pd.to_numeric(raw[column], errors="coerce").fillna(0).to_numpy() if column in raw else 0
+
+        duplicated = stats.duplicated(keys, keep=False)
+        if duplicated.any():
+            first_names = stats.drop_duplicates(keys).set_index(keys)["stats_name"]
+            stats = stats.drop_duplicates(keys, keep="last")
+            stats["stats_name"] = first_names.reindex(pd.MultiIndex.from_frame(stats[keys])).to_numpy()
+        merged = left.merge(stats, on=keys, how="outer")
+    else:
+        merged = left.assign(stats_name=None, **{field: 0 for field in STATS_COLUMNS.values()})
+
+    if merged.empty:
+        return []
+
+    rows = pd.DataFrame({
+        "annotator_id": merged["annotator_id"],
+        "name": merged["name"].fillna(merged["stats_name"]),
+        "language": merged["language"],
+        "report_date": merged["report_date"],
+        "files_read": merged["files_read"].fillna(0).astype(int),
+        "remaining_texts": merged["remaining_texts"].fillna(0).astype(int),
+        "minutes_recorded": merged["minutes_recorded"].fillna(0).astype(float),
+        "has_started": merged["name"].isna(),
+        "created_at": date.today(),
+    })
+    return rows[ROW_FIELDS].to_dict(orient="records")
+
+
+def iter_report_folders(base_path: Path) -> Iterator[Tuple[str, Path]]:
     for language_folder in base_path.iterdir():
         if not language_folder.is_dir():
             continue
@@ -81,10 +196,119 @@ def process_all_languages(base_path: Path) -> List[AnnotatorStat]:
             if not report_folder.is_dir():
                 continue
 
-            annotator_stats = parse_report_and_stats(language, report_folder)
-            all_stats.extend(annotator_stats)
+            yield language, report_folder
+
+
+def report_folders_for_paths(base_path: Path, paths: Iterable[str]) -> List[Tuple[str, Path]]:
+    """Map repo-relative changed files (reports/<lang>/<YYYYMMDD>/...) to the report folders that need re-parsing."""
+    folders = set()
+    for path in paths:
+        parts = Path(path).parts
+        if len(parts) < 4 or parts[0] != base_path.name:
+            continue
+
+        language, date_folder = parts[1], parts[2]
+        folder = base_path / language / date_folder
+        # Deleted folders have nothing left to parse
+        if folder.is_dir():
+            folders.add((language, folder))
+
+    return sorted(folders)
+
 
-    return all_stats
+def chunked(items: Iterable, size: int) -> Iterator[list]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+_parse_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_parse_pool(workers: int = PARSE_WORKERS) -> ProcessPoolExecutor:
+    """Long-lived pool of parser processes, started on first use and reused by every webhook."""
+    global _parse_pool
+    if _parse_pool is None:
+        methods = multiprocessing.get_all_start_methods()
+        # Never fork the server itself: it has threads (uvicorn, job runner, Sheets writers) running
+        ctx = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        if ctx.get_start_method() == "forkserver":
+            # pandas is imported lazily by the app, but every parser worker needs it: load it once here
+            ctx.set_forkserver_preload(["src.process_data", "pandas"])
+        _parse_pool = ProcessPoolExecutor(max_workers=workers, mp_context=ctx)
+        print(f"🧮 Started {workers} report parser processes")
+    return _parse_pool
+
+
+def shutdown_parse_pool():
+    global _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown(cancel_futures=True)
+        _parse_pool = None
+
+
+async def iter_parsed_batches(
+    folders: Iterable[Tuple[str, Path]],
+    workers: int = PARSE_WORKERS,
+    chunk_size: int = PARSE_CHUNK_FOLDERS,
+) -> AsyncIterator[List[dict]]:
+    """
+    Parse report folders `chunk_size` at a time and yield each chunk's rows as soon as it is ready
+    (not in folder order). With workers > 1 the chunks run in the process pool, at most two per
+    worker in flight; small jobs and workers <= 1 parse in a thread instead.
+    """
+    folders = list(folders)
+    if workers <= 1 or len(folders) <= chunk_size:
+        for chunk in chunked(folders, chunk_size):
+            yield await asyncio.to_thread(parse_report_batch, chunk)
+        return
+
+    loop = asyncio.get_running_loop()
+    pool = get_parse_pool(workers)
+    pending = set()
+    try:
+        chunks = chunked(folders, chunk_size)
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < workers * 2:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    exhausted = True
+                else:
+                    pending.add(loop.run_in_executor(pool, parse_report_batch, chunk))
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM); start a fresh pool next time
+        shutdown_parse_pool()
+        raise
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+REPORTS_STATE_KEY = "reports"
+
+
+async def get_last_ingested_commit(db: AsyncSession, source: str = REPORTS_STATE_KEY) -> Optional[str]:
+    state = await db.get(IngestionState, source)
+    return state.commit_sha if state else None
+
+
+async def set_last_ingested_commit(db: AsyncSession, commit_sha: str, source: str = REPORTS_STATE_KEY):
+    """Record the ingested commit; committed together with the upserted rows."""
+    state = await db.get(IngestionState, source)
+    if state:
+        state.commit_sha = commit_sha
+        state.updated_at = utc_now()
+    else:
+        db.add(IngestionState(source=source, commit_sha=commit_sha))
 
 
 
@@ -111,4 +335,162 @@ async def update_or_create_language_stat(db: AsyncSession, language: str, data:
                 setattr(existing, key, value)
     else:
         new_record = AnnotatorStat(**data)
-        db.add(new_record)
\ No newline at end of file
+        db.add(new_record)
+
+
+
+# Rows per INSERT statement; 9 columns keeps us well under Postgres' 32767 bind-parameter limit
+UPSERT_BATCH_SIZE = 1000
+CONFLICT_KEYS = ("annotator_id", "language", "report_date")
+
+
+async def bulk_upsert_language_stats(db: AsyncSession, rows: Iterable[dict], batch_size: int = UPSERT_BATCH_SIZE) -> int:
+    """
+    Insert or update many annotator rows with INSERT ... ON CONFLICT DO UPDATE,
+    one statement per batch instead of a SELECT + write per row.
+    Does not commit; returns the number of distinct rows written.
+    """
+    # A single statement cannot touch the same row twice, so keep the last value per key
+    unique_rows = {}
+    for row in rows:
+        if not row.get("annotator_id") or not row.get("report_date"):
+            continue
+        unique_rows[tuple(row[k] for k in CONFLICT_KEYS)] = row
+    rows = list(unique_rows.values())
+    if not rows:
+        return 0
+
+    insert = pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+    table = AnnotatorStat.__table__
+
+    for i in range(0, len(rows), batch_size):
+        stmt = insert(table).values(rows[i:i + batch_size])
+        update_columns = {
+            col: stmt.excluded[col]
+            for col in rows[i].keys()
+            if col not in CONFLICT_KEYS and col != "id"
+        }
+        await db.execute(stmt.on_conflict_do_update(index_elements=list(CONFLICT_KEYS), set_=update_columns))
+
+    return len(rows)
+
+
+async def refresh_daily_summaries(db: AsyncSession, pairs: Iterable[Tuple[str, object]] = None) -> int:
+    """
+    Recompute language_daily_summary for the given (language, report_date) pairs from annotator_stats,
+    or for every pair when `pairs` is None. Does not commit; returns the number of rollup rows written.
+    """
+    stmt = select(
+        AnnotatorStat.language,
+        AnnotatorStat.report_date,
+        func.count(AnnotatorStat.id).label("annotator_count"),
+        func.coalesce(func.sum(AnnotatorStat.minutes_recorded), 0.0).label("total_minutes"),
+        func.coalesce(func.sum(AnnotatorStat.files_read), 0).label("total_files_read"),
+    ).group_by(AnnotatorStat.language, AnnotatorStat.report_date)
+
+    if pairs is not None:
+        pairs = set(pairs)
+        if not pairs:
+            return 0
+        languages = {language for language, _ in pairs}
+        dates = {report_date for _, report_date in pairs}
+        stmt = stmt.where(AnnotatorStat.language.in_(languages), AnnotatorStat.report_date.in_(dates))
+
+    rows = [
+        {
+            "language": r.language,
+            "report_date": r.report_date,
+            "annotator_count": r.annotator_count,
+            "total_minutes": float(r.total_minutes),
+            "total_files_read": int(r.total_files_read),
+            "updated_at": utc_now(),
+        }
+        for r in (await db.execute(stmt)).all()
+        if pairs is None or (r.language, r.report_date) in pairs
+    ]
+    if not rows:
+        return 0
+
+    insert = pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+    for i in range(0, len(rows), UPSERT_BATCH_SIZE):
+        stmt = insert(LanguageDailySummary.__table__).values(rows[i:i + UPSERT_BATCH_SIZE])
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=["language", "report_date"],
+            set_={col: stmt.excluded[col] for col in ("annotator_count", "total_minutes", "total_files_read", "updated_at")},
+        ))
+
+    return len(rows)
+
+
+async def ensure_daily_summaries(db: AsyncSession):
+    """Backfill the rollup once for databases that had annotator_stats before it existed."""
+    existing = await db.execute(select(LanguageDailySummary.language).limit(1))
+    if existing.first() is None:
+        written = await refresh_daily_summaries(db)
+        await db.commit()
+        print(f"📦 Backfilled {written} language_daily_summary rows")
+
+
+
+# Rows upserted and committed together by the streaming ingestion (rounded up to whole parsed chunks)
+INGEST_BATCH_ROWS = int(os.getenv("INGEST_BATCH_ROWS", "5000"))
+# Batches parsed ahead of the database writer before parsing pauses
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "2"))
+
+
+async def ingest_report_folders(
+    db: AsyncSession,
+    folders: Iterable[Tuple[str, Path]],
+    batch_rows: int = INGEST_BATCH_ROWS,
+    queue_size: int = INGEST_QUEUE_SIZE,
+) -> dict:
+    """
+    Parse -> batch -> upsert -> commit, streamed. Parsing (iter_parsed_batches) feeds a bounded queue
+    while the writer upserts and commits the previous batch, so DB writes overlap with parsing and a
+    full queue stalls the parsers instead of growing memory. Peak memory is about
+    (queue_size + 2) batches no matter how many folders there are.
+
+    Every batch is committed on its own. The caller should record the ingested commit only after
+    this returns: a failure halfway leaves earlier batches in place, and re-running is idempotent.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, queue_size))
+    totals = {"rows": 0, "batches": 0, "languages": set()}
+
+    async def produce():
+        batch = []
+        async for rows in iter_parsed_batches(folders):
+            # Whole parsed chunks stay together so each (language, date) rollup is refreshed once
+            batch.extend(rows)
+            if len(batch) >= batch_rows:
+                await queue.put(batch)
+                batch = []
+        if batch:
+            await queue.put(batch)
+
+    async def write(batch: List[dict]):
+        await bulk_upsert_language_stats(db, batch)
+        await refresh_daily_summaries(db, {(r["language"], r["report_date"]) for r in batch})
+        await db.commit()
+        totals["rows"] += len(batch)
+        totals["batches"] += 1
+        totals["languages"].update(r["language"] for r in batch)
+        print(f"💾 Committed batch {totals['batches']} ({len(batch)} rows, {totals['rows']} so far)")
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            get = asyncio.create_task(queue.get())
+            done, _ = await asyncio.wait({get, producer}, return_when=asyncio.FIRST_COMPLETED)
+            if get in done:
+                await write(get.result())
+                continue
+
+            get.cancel()
+            producer.result()  # re-raises a parsing error
+            while not queue.empty():
+                await write(queue.get_nowait())
+            break
+    finally:
+        producer.cancel()
+
+    return totals
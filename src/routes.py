@@ -1,31 +1,51 @@
-from fastapi import Request, Header, HTTPException, APIRouter, Depends
+from fastapi import Request, Response, Header, HTTPException, APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 from dotenv import load_dotenv
+import asyncio
 import subprocess
 import hmac
-from typing import List
+from typing import List, Literal
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, tuple_
 from pathlib import Path
 import hashlib
+import json
 import os
-import pandas as pd
-import requests
 import io
-from datetime import datetime
-import pandas as pd
+from datetime import date, datetime
+from typing import Optional
 from src.utils.audio_data_summary import  push_all_audio_summary_sheets, push_all_audio_summary_sheets_multiple
-from src.db import get_session
-from src.models import AnnotatorStat
-from src.process_data import update_or_create_language_stat, process_all_languages
+from src.db import get_session, async_session_maker
+from src.jobs import job_runner, job_accepted
+from src.models import AnnotatorStat, LanguageDailySummary
+from src.process_data import (
+    get_last_ingested_commit,
+    ingest_report_folders,
+    iter_report_folders,
+    report_folders_for_paths,
+    set_last_ingested_commit,
+)
 from src.utils.trigger_webhook import trigger_github_webhook
 from src.utils.count_summary import get_folder_stats, write_summary_to_sheet
 from src.utils.annotator import  push_annotators_to_sheet
+from src.utils.count_audio import count_audio_files_deep
+from src.utils.sheet_writer import write_to_sheet
+from src.utils.report_source import get_report_source
+from src.utils.report_index import report_index
+from src.utils.http_cache import cached_get
+from src.utils.git_repo import changed_paths, repo_sync
+from src.utils.repo_events import notify_repo_update
+from src.utils.response_cache import cached_response
+from src.utils.single_flight import single_flight
+from src.utils.lazy import lazy_import
+
+pd = lazy_import("pandas")
+requests = lazy_import("requests")
 
 load_dotenv()
 # Load from .env
 GITHUB_SECRET =  os.getenv("GITHUB_TOKEN")
 REPO_PATH = Path(os.getenv("REPO_PATH", "./dsn-voice")).resolve()
-REPO_URL = "https://github.com/abumafrim/dsn-voice.git"
 
 
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
@@ -42,6 +62,9 @@ get_registered_annotators_url = f"https://raw.githubusercontent.com/{REPO_OWNER}
 
 github_router = APIRouter()
 
+# Serializes webhook ingestions within this process
+ingest_lock = asyncio.Lock()
+
 @github_router.post("/github-webhook", include_in_schema=False)
 async def github_webhook(
     request: Request,
@@ -66,40 +89,54 @@ async def github_webhook(
     if not hmac.compare_digest(computed_signature, x_hub_signature_256):
         raise HTTPException(status_code=403, detail="Invalid signature")
 
-    # 🔄 Clone or Pull Repo
-    if not REPO_PATH.exists():
-        print(f"📥 Cloning repository into {REPO_PATH}...")
-        subprocess.run([
-            "git", "clone", "--filter=blob:none", "--no-checkout",
-            REPO_URL, str(REPO_PATH)
-        ], check=True)
-        subprocess.run(["git", "sparse-checkout", "init", "--cone"], cwd=REPO_PATH, check=True)
-        subprocess.run(["git", "sparse-checkout", "set", "reports"], cwd=REPO_PATH, check=True)
-
-        # ✅ This ensures the reports/ folder is actually checked out
-        subprocess.run(["git", "checkout", "main"], cwd=REPO_PATH, check=True)
-
-    print(f"🔄 Pulling latest changes into {REPO_PATH}...")
-
+    # 🔄 Clone or fetch off the event loop; a burst of deliveries shares one fetch
     try:
-        print("🔄 Starting pull...")
-        subprocess.run(["git", "pull"], cwd=REPO_PATH, check=True)
+        head = await repo_sync.sync()
     except subprocess.CalledProcessError as e:
-        raise HTTPException(status_code=500, detail=f"Git pull failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Git sync failed: {e.stderr or e}")
+
+    # One ingestion at a time: a coalesced delivery then finds the commit already ingested
+    async with ingest_lock:
+        return await ingest_commit(db, head)
 
-    # 📊 Process data
-    report_path = REPO_PATH / "reports"
-    annotators = process_all_languages(report_path)
 
-    for a in annotators:
-        await update_or_create_language_stat(db, a.language, a.dict(exclude={"id"}))
+async def ingest_commit(db: AsyncSession, head: str) -> dict:
+    # 📊 Process data: only the report folders touched since the last ingested commit
+    report_path = REPO_PATH / "reports"
+    last_commit = await get_last_ingested_commit(db)
 
+    changed = None
+    if last_commit and last_commit != head:
+        try:
+            changed = await changed_paths(REPO_PATH, last_commit, head, "reports")
+        except subprocess.CalledProcessError as e:
+            print(f"⚠️ Could not diff {last_commit}..{head}, re-ingesting everything: {e}")
+
+    if last_commit == head:
+        mode, folders = "unchanged", []
+    elif changed is not None:
+        mode, folders = "incremental", report_folders_for_paths(report_path, changed)
+    else:
+        mode, folders = "full", list(iter_report_folders(report_path))
+    print(f"📊 {mode} ingestion of {len(folders)} report folders at {head}")
+
+    # In-memory caches of files under reports/ drop whatever this pull changed
+    if mode != "unchanged":
+        notify_repo_update(changed)
+
+    # Streamed in committed batches; the commit marker moves only once every batch is in
+    ingested = await ingest_report_folders(db, folders)
+    await set_last_ingested_commit(db, head)
     await db.commit()
 
     return {
         "message": "Update successful",
-        "total_annotators": len(annotators),
-        "languages": list(set([a.language for a in annotators]))
+        "mode": mode,
+        "commit": head,
+        "report_folders": len(folders),
+        "total_annotators": ingested["rows"],
+        "batches": ingested["batches"],
+        "languages": sorted(ingested["languages"])
     }
 
 
@@ -112,47 +149,54 @@ async def trigger():
 
 
 
-@github_router.get("/google_sheet_count_summary", tags=["Count Google Sheets"])
-def update_annotator_summary():
+def sync_annotator_summary(progress=None):
     data = get_folder_stats()
+    if progress:
+        progress(f"writing {len(data)} annotators to sheets")
     write_summary_to_sheet(data)
     return {"status": "success", "data": data}
 
 
-# @github_router.get("/google_sheet_count-audio", tags=["Count Google Sheets"])
-# def get_audio_analytics():
-#     data = count_audio_files_deep()
-#     write_to_sheet(data)
-#     return data
+# 🧵 Long sheet syncs run in the background job runner, see /jobs/{id}
+job_runner.register("annotator_count_summary", sync_annotator_summary)
+job_runner.register("audio_summary_to_sheets", push_all_audio_summary_sheets)
+job_runner.register("audio_summary_to_multiple_sheets", push_all_audio_summary_sheets_multiple)
+
+
+@github_router.get("/google_sheet_count_summary", status_code=202, tags=["Count Google Sheets"])
+async def update_annotator_summary():
+    job, created = await job_runner.submit("annotator_count_summary")
+    return job_accepted(job, created)
+
+
+@github_router.get("/google_sheet_count-audio", tags=["Count Google Sheets"])
+def get_audio_analytics(mode: Optional[Literal["local", "tree", "contents"]] = None):
+    data = count_audio_files_deep(mode)
+    if "error" in data:
+        raise HTTPException(status_code=502, detail=data)
+    write_to_sheet(data)
+    return data
 
 
 
 AUDIO_SUMMARY_PATH = REPO_PATH / "reports" / "audio_data_summary.xlsx"
-@github_router.post("/audio_data_summary_to_sheets", tags=["Completed Task Google Sheets"])
+@github_router.post("/audio_data_summary_to_sheets", status_code=202, tags=["Completed Task Google Sheets"])
 async def push_audio_summary_to_sheets():
     """
-        Fetches the latest audio_data_summary.xlsx directly from GitHub,
+        Queues a job that fetches the latest audio_data_summary.xlsx,
         parses all language sheets, and writes them to Google Sheets.
     """
-    try:
-        push_all_audio_summary_sheets()
-        return {"message": "✅ Google Sheets updated for all languages via GitHub"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    job, created = await job_runner.submit("audio_summary_to_sheets")
+    return job_accepted(job, created)
 
 
 
 AUDIO_SUMMARY_PATH = REPO_PATH / "reports" / "audio_data_summary.xlsx"
-@github_router.post("/audio_data_summary_to_multiple_sheets", tags=["Completed Task Google Sheets"])
+@github_router.post("/audio_data_summary_to_multiple_sheets", status_code=202, tags=["Completed Task Google Sheets"])
 async def push_audio_summary_to_multiple_sheets():
-    """Pushes language-specific audio data to individual Google Sheets."""
-    try:
-        push_all_audio_summary_sheets_multiple()
-        return {"message": "✅ Google Sheets updated for all languages via GitHub"}
-    except Exception as e:
-        import traceback
-        traceback.print_exc()  # 👈 shows full error trace in terminal
-        raise HTTPException(status_code=500, detail=str(e))
+    """Queues a job that pushes language-specific audio data to individual Google Sheets."""
+    job, created = await job_runner.submit("audio_summary_to_multiple_sheets")
+    return job_accepted(job, created)
 
 
 
@@ -171,29 +215,135 @@ def get_annotator_data():
 #     return get_annotators_json()
 
 
+ANNOTATORS_PAGE_SIZE = 1000
+ANNOTATORS_STREAM_BATCH = 1000
+
+
+def encode_cursor(row: AnnotatorStat) -> str:
+    return f"{row.report_date.isoformat()}:{row.id}"
+
+
+def decode_cursor(cursor: str):
+    try:
+        report_date, row_id = cursor.split(":")
+        return date.fromisoformat(report_date), int(row_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor '{cursor}'")
+
+
 @github_router.get("/annotators", response_model=List[AnnotatorStat], tags=["Annotator Data"])
-async def get_annotators(db: AsyncSession = Depends(get_session)):
+async def get_annotators(
+    request: Request,
+    response: Response,
+    language: Optional[str] = None,
+    annotator_id: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    has_started: Optional[bool] = None,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=10000, description=f"Page size; without limit or cursor every row is returned (a cursor alone pages by {ANNOTATORS_PAGE_SIZE})"),
+    format: Literal["json", "ndjson"] = "json",
+    db: AsyncSession = Depends(get_session),
+):
+    """
+    Newest first. Without `limit` or `cursor` every matching row is returned, as before.
+    Passing either switches to keyset pagination on (report_date, id): the next page's cursor is
+    returned in the X-Next-Cursor and Link headers. format=ndjson streams rows from a server-side
+    cursor instead.
+    """
     stmt = select(AnnotatorStat)
-    result = await db.execute(stmt)
-    return result.scalars().all()
-
-@github_router.get("/annotators/summary", tags=["Annotator Data"])
-async def get_summary(db: AsyncSession = Depends(get_session)):
-    stmt = (
-        select(
-            AnnotatorStat.language,
-            func.count(AnnotatorStat.id).label("annotator_count"),
-            func.sum(AnnotatorStat.minutes_recorded).label("total_minutes"),
-            func.sum(AnnotatorStat.files_read).label("total_files_read")
+    if language:
+        stmt = stmt.where(AnnotatorStat.language == language)
+    if annotator_id:
+        stmt = stmt.where(AnnotatorStat.annotator_id == annotator_id)
+    if start_date:
+        stmt = stmt.where(AnnotatorStat.report_date >= start_date)
+    if end_date:
+        stmt = stmt.where(AnnotatorStat.report_date <= end_date)
+    if has_started is not None:
+        stmt = stmt.where(AnnotatorStat.has_started == has_started)
+    if cursor:
+        stmt = stmt.where(tuple_(AnnotatorStat.report_date, AnnotatorStat.id) < tuple_(*decode_cursor(cursor)))
+    stmt = stmt.order_by(AnnotatorStat.report_date.desc(), AnnotatorStat.id.desc())
+
+    if format == "ndjson":
+        if limit:
+            stmt = stmt.limit(limit)
+        return StreamingResponse(stream_annotators(stmt), media_type="application/x-ndjson")
+
+    if limit is None and cursor is None:
+        result = await db.execute(stmt)
+        return result.scalars().all()
+
+    limit = limit or ANNOTATORS_PAGE_SIZE
+    result = await db.execute(stmt.limit(limit + 1))
+    rows = result.scalars().all()
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1])
+        response.headers["X-Next-Cursor"] = next_cursor
+        response.headers["Link"] = f'<{request.url.include_query_params(cursor=next_cursor)}>; rel="next"'
+
+    return rows
+
+
+async def stream_annotators(stmt):
+    # Own session: the request-scoped one may be closed before the body finishes streaming
+    async with async_session_maker() as session:
+        result = await session.stream_scalars(stmt.execution_options(yield_per=ANNOTATORS_STREAM_BATCH))
+        async for row in result:
+            yield json.dumps(row.dict(), default=str) + "\n"
+
+@github_router.get(
+    "/annotators/summary",
+    tags=["Annotator Data"],
+    response_description="One row per language and report date, ordered by date then language",
+)
+async def get_summary(
+    report_date: Optional[date] = Query(None, alias="date", description="Single report date (YYYY-MM-DD)"),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    language: Optional[str] = None,
+    db: AsyncSession = Depends(get_session),
+):
+    """
+    Per-language, per-day rows from the language_daily_summary rollup.
+    `date` returns that day; `start_date`/`end_date` return every day in the range (one row per
+    language per day, not summed over the range). Without a date filter, returns each language's
+    latest report date.
+    """
+    stmt = select(LanguageDailySummary)
+
+    if report_date:
+        stmt = stmt.where(LanguageDailySummary.report_date == report_date)
+    elif start_date or end_date:
+        if start_date:
+            stmt = stmt.where(LanguageDailySummary.report_date >= start_date)
+        if end_date:
+            stmt = stmt.where(LanguageDailySummary.report_date <= end_date)
+    else:
+        latest = (
+            select(LanguageDailySummary.language, func.max(LanguageDailySummary.report_date).label("report_date"))
+            .group_by(LanguageDailySummary.language)
+            .subquery()
         )
-        .group_by(AnnotatorStat.language)
-    )
-    result = await db.execute(stmt)
-    rows = result.all()
+        stmt = stmt.join(
+            latest,
+            (LanguageDailySummary.language == latest.c.language)
+            & (LanguageDailySummary.report_date == latest.c.report_date),
+        )
+
+    if language:
+        stmt = stmt.where(LanguageDailySummary.language == language)
+
+    result = await db.execute(stmt.order_by(LanguageDailySummary.report_date, LanguageDailySummary.language))
+    rows = result.scalars().all()
 
     return [
         {
             "language": r.language,
+            "report_date": r.report_date,
             "annotator_count": r.annotator_count,
             "total_minutes": round(r.total_minutes or 0, 2),
             "total_files_read": r.total_files_read or 0
@@ -203,10 +353,19 @@ async def get_summary(db: AsyncSession = Depends(get_session)):
 
 
 
+@single_flight()
+def fetch_github_file(url: str) -> "requests.Response":
+    # Shared by concurrent requests for the same file, so the body is read before handing it out
+    res = cached_get(url, headers=headers)
+    res.content
+    return res
+
+
 @github_router.get("/annotator-status", tags=["Annotator Data"])
+@cached_response(ttl=300)
 def get_annotator_status_json():
     try:
-        res = requests.get(annotator_status_url, headers=headers)
+        res = fetch_github_file(annotator_status_url)
         res.raise_for_status()
         df = pd.read_csv(io.StringIO(res.text))
 
@@ -220,9 +379,10 @@ def get_annotator_status_json():
 
 
 @github_router.get("/registered-annotators", tags=["Annotator Data"])
+@cached_response(ttl=300)
 def get_registered_annotators():
     try:
-        response = requests.get(get_registered_annotators_url, headers=headers)
+        response = fetch_github_file(get_registered_annotators_url)
         response.raise_for_status()
     except requests.RequestException as e:
         raise HTTPException(status_code=500, detail=f"Error fetching CSV: {str(e)}")
@@ -241,73 +401,60 @@ def get_registered_annotators():
 
 
 
-stats_json_url = f"https://api.github.com/repos/{REPO_OWNER}/{REPO_NAME}/contents/reports"
-RAW_BASE = f"https://raw.githubusercontent.com/{REPO_OWNER}/{REPO_NAME}/main/reports"
-
 headers = {"Authorization": f"token {GITHUB_TOKEN}"}
 
 @github_router.get("/stats-json", tags=["Completed Task Google Sheets"])
-def fetch_all_stats_flat_for_today():
+@cached_response(ttl=120, depends_on=("reports",))
+async def fetch_all_stats_flat_for_today():
     today = datetime.utcnow().strftime("%Y%m%d")
+    source = get_report_source()
     try:
-        res = requests.get(stats_json_url, headers=headers)
-        res.raise_for_status()
-        folders = res.json()
+        index = await report_index.get_async()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to list language folders: {str(e)}")
+    # Languages without a report today are known from the index, no need to ask GitHub
+    languages = [lang for lang in index.languages() if index.has(lang, today, "report.txt")]
 
-    all_rows = []
-
-    for folder in folders:
-        if folder["type"] != "dir":
-            continue
-
-        lang = folder["name"]
-        txt_url = f"{RAW_BASE}/{lang}/{today}/report.txt"
-
+    async def today_summary(lang: str):
         try:
-            txt_res = requests.get(txt_url, headers=headers)
-            if txt_res.status_code != 200:
-                continue
+            text = await source.read_text_async(f"reports/{lang}/{today}/report.txt")
 
-            lines = txt_res.text.strip().splitlines()
-            summary = {
+            lines = text.strip().splitlines()
+            return {
                 "language": lang,
                 "annotators": safe_int(lines[1]),
                 "files_read": safe_int(lines[2]),
                 "remaining_texts": safe_int(lines[3]),
                 "minutes_recorded": safe_float(lines[4])
             }
-            all_rows.append(summary)
         except Exception:
-            continue  # silently skip bad folders
+            return None  # silently skip bad or missing folders
 
-    return all_rows
+    # All languages at once: latency is the slowest language, not the sum
+    results = await asyncio.gather(*(today_summary(lang) for lang in languages))
+    return [r for r in results if r is not None]
 
 
 
 
 # ✅ Fetch stats for specific language
 @github_router.get("/stats-json/{language}", tags=["Completed Task Google Sheets"])
-def fetch_stats_for_language(language: str):
-    # Step 1: List folders inside reports/{language}
-    sub_url = f"https://api.github.com/repos/{REPO_OWNER}/{REPO_NAME}/contents/reports/{language}"
+@cached_response(ttl=120, depends_on=("reports",))
+async def fetch_stats_for_language(language: str):
+    source = get_report_source()
+
+    # Step 1: Latest date folder inside reports/{language}, from the report index
     try:
-        res = requests.get(sub_url, headers=headers)
-        res.raise_for_status()
-        folders = [f["name"] for f in res.json() if f["type"] == "dir"]
-        if not folders:
+        latest_date = (await report_index.get_async()).latest(language)
+        if not latest_date:
             raise HTTPException(status_code=404, detail=f"No date folders found for language '{language}'")
-        latest_date = sorted(folders, reverse=True)[0]
     except Exception as e:
         raise HTTPException(status_code=404, detail=f"Could not fetch folders for language '{language}': {str(e)}")
 
     # Step 2: Use latest folder to fetch stats.csv
-    csv_url = f"{RAW_BASE}/{language}/{latest_date}/stats.csv"
     try:
-        res = requests.get(csv_url, headers=headers)
-        res.raise_for_status()
-        df = pd.read_csv(io.StringIO(res.text))
+        content = await source.read_bytes_async(f"reports/{language}/{latest_date}/stats.csv")
+        df = await asyncio.to_thread(pd.read_csv, io.BytesIO(content))
         df["language"] = language
         return df.to_dict(orient="records")
     except Exception as e:
@@ -319,71 +466,49 @@ def fetch_stats_for_language(language: str):
     
 
 
+def parse_annotation_summary(lang: str, text: str) -> Optional[dict]:
+    lines = text.strip().splitlines()
+    for i, line in enumerate(lines):
+        if line.strip().lower().startswith("annotation info"):
+            summary = {
+                "language": line.split(":")[1].strip() if ":" in line else lang,
+                "annotators": safe_int(lines[i+1]),
+                "files_read": safe_int(lines[i+2]),
+                "remaining_texts": safe_int(lines[i+3]),
+                "minutes_recorded": safe_float(lines[i+4])
+            }
+            if all(v is not None for v in summary.values()):
+                return summary
+            print(f"⚠️ Skipping summary for {lang} due to parsing error: {summary}")
+            return None
+    return None
+
+
 @github_router.get("/stats-summary", tags=["Completed Task Google Sheets"])
-def fetch_annotation_summary_all_languages():
+@cached_response(ttl=120, depends_on=("reports",))
+async def fetch_annotation_summary_all_languages():
+    source = get_report_source()
     try:
-        res = requests.get(stats_json_url, headers=headers)
-        res.raise_for_status()
-        folders = res.json()
-        print(f"🔎 Found {len(folders)} language folders")
+        index = await report_index.get_async()
+        languages = index.languages()
+        print(f"🔎 Found {len(languages)} language folders")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to list language folders: {str(e)}")
 
-    summaries = []
-
-    for folder in folders:
-        if folder["type"] != "dir":
-            continue
-
-        lang = folder["name"]
-        print(f"📁 Checking language folder: {lang}")
-
-        # 🔍 List date folders inside /reports/{lang}
-        sub_url = f"https://api.github.com/repos/{REPO_OWNER}/{REPO_NAME}/contents/reports/{lang}"
-        sub_res = requests.get(sub_url, headers=headers)
-        if sub_res.status_code != 200:
-            continue
-
-        subfolders = [f["name"] for f in sub_res.json() if f["type"] == "dir"]
-        if not subfolders:
-            continue
-
-        # 📅 Sort to get the latest folder by date
-        latest_date = sorted(subfolders, reverse=True)[0]
-
-        txt_url = f"{RAW_BASE}/{lang}/{latest_date}/report.txt"
-
+    async def language_summary(lang: str):
+        # 🔍 Latest date folder inside /reports/{lang}, then its report.txt, parsed as soon as it lands
         try:
-            txt_res = requests.get(txt_url, headers=headers)
-            if txt_res.status_code != 200:
-                continue
-
-            lines = txt_res.text.strip().splitlines()
+            latest_date = index.latest(lang)
+            if not latest_date:
+                return None
+            text = await source.read_text_async(f"reports/{lang}/{latest_date}/report.txt")
             print(f"📄 Found report.txt for {lang}/{latest_date}")
-
-            summary = {}
-
-            for i, line in enumerate(lines):
-                if line.strip().lower().startswith("annotation info"):
-                    summary = {
-                        "language": line.split(":")[1].strip() if ":" in line else lang,
-                        "annotators": safe_int(lines[i+1]),
-                        "files_read": safe_int(lines[i+2]),
-                        "remaining_texts": safe_int(lines[i+3]),
-                        "minutes_recorded": safe_float(lines[i+4])
-                    }
-
-                    if all(v is not None for v in summary.values()):
-                        summaries.append(summary)
-                    else:
-                        print(f"⚠️ Skipping summary for {lang} due to parsing error: {summary}")
-                    break
-            print(f"📃 Content of report.txt for {lang}:\n{txt_res.text}")
-
+            return parse_annotation_summary(lang, text)
         except Exception:
-            continue
+            return None
 
-    return summaries
+    results = await asyncio.gather(*(language_summary(lang) for lang in languages))
+    return [r for r in results if r is not None]
 
 
 
@@ -1,16 +1,16 @@
-import os
 import io
-import requests
-import pandas as pd
-import gspread
+import asyncio
 from fastapi import HTTPException
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 from dotenv import load_dotenv
-from src.utils.credentials import get_credentials_with_retry
+from src.utils.sheets_client import sheets
+from src.utils.sheet_sync import sync_dataframe
+from src.utils.github_async import build_client, async_safe_get, gather_bounded
+from src.utils.lazy import lazy_import
+
+pd = lazy_import("pandas")
 
 load_dotenv()
 
-GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 REPO_OWNER = "lawallanre00490038"
 REPO_NAME = "dsn-voice"
 BASE_API = f"https://api.github.com/repos/{REPO_OWNER}/{REPO_NAME}/contents/annotators"
@@ -20,75 +20,55 @@ SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
 SHEET_ID = "1JW8mRPgOZ8xIgwq4EKvfd-uILPQCZCdfFgsJqDJ5Zmc"
 
 
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1.5), retry=retry_if_exception_type(Exception))
-def safe_get(url, headers=None):
-    res = requests.get(url, headers=headers)
-    res.raise_for_status()
-    return res
-
-
-def get_github_folders():
-    headers = {"Authorization": f"token {GITHUB_TOKEN}"}
-    res = safe_get(BASE_API, headers=headers)
-    return [f["name"] for f in res.json() if f["type"] == "dir"]
+def parse_annotator_file(annotator, file_name, content: bytes) -> "pd.DataFrame":
+    sep = "\t" if file_name.endswith(".tsv") else ","
+    df = pd.read_csv(io.BytesIO(content), sep=sep)
+    df["annotator"] = annotator
+    return df
 
 
-def read_csv_from_github(annotator, file_name):
+async def read_csv_from_github_async(client, annotator, file_name):
     url = f"{RAW_BASE}/{annotator}/{file_name}"
-    headers = {"Authorization": f"token {GITHUB_TOKEN}"}
     try:
-        res = safe_get(url, headers=headers)
-        if file_name.endswith(".tsv"):
-            df = pd.read_csv(io.StringIO(res.text), sep="\t")
-        else:
-            df = pd.read_csv(io.StringIO(res.text))
-        df["annotator"] = annotator
-        return df
+        res = await async_safe_get(client, url)
+        # pandas parsing is CPU-bound, keep it off the event loop
+        return await asyncio.to_thread(parse_annotator_file, annotator, file_name, res.content)
     except Exception as e:
         print(f"⚠️ Skipping {annotator}/{file_name}: {e}")
         return None
 
 
-def fetch_annotator_data():
-    folders = get_github_folders()
-    assigned_data = []
-    recording_stats = []
-
-    for annotator in folders:
-        print("Fetching data for", annotator)
-        assigned_df = read_csv_from_github(annotator, "assigned_data.tsv")
-        stats_df = read_csv_from_github(annotator, "recording_stats.csv")
+async def fetch_annotator_data_async():
+    """Pull assigned_data.tsv and recording_stats.csv for every annotator concurrently."""
+    async with build_client() as client:
+        res = await async_safe_get(client, BASE_API)
+        folders = [f["name"] for f in res.json() if f["type"] == "dir"]
+        print(f"Fetching data for {len(folders)} annotators")
 
-        if assigned_df is not None and not assigned_df.empty:
-            assigned_data.append(assigned_df)
-        if stats_df is not None and not stats_df.empty:
-            recording_stats.append(stats_df)
+        jobs = []
+        for annotator in folders:
+            jobs.append(read_csv_from_github_async(client, annotator, "assigned_data.tsv"))
+            jobs.append(read_csv_from_github_async(client, annotator, "recording_stats.csv"))
+        frames = await gather_bounded(jobs)
 
+    assigned_data = [df for df in frames[0::2] if df is not None and not df.empty]
+    recording_stats = [df for df in frames[1::2] if df is not None and not df.empty]
     return assigned_data, recording_stats
 
 
-def write_to_google_sheet(sheet_name: str, df: pd.DataFrame):
+def fetch_annotator_data():
+    return asyncio.run(fetch_annotator_data_async())
+
+
+def write_to_google_sheet(sheet_name: str, df: "pd.DataFrame"):
     if df.empty:
         print(f"⚠️ Skipping sheet '{sheet_name}' because DataFrame is empty.")
         return
 
-    creds = get_credentials_with_retry()
-    client = gspread.authorize(creds)
-
-    try:
-        worksheet = client.open_by_key(SHEET_ID).worksheet(sheet_name)
-    except gspread.exceptions.WorksheetNotFound:
-        worksheet = client.open_by_key(SHEET_ID).add_worksheet(title=sheet_name, rows="1000", cols="20")
-
-    worksheet.clear()
-
-    # Sanitize and write data
+    # Sanitize and write only the changed cells
     cleaned_df = df.fillna("").infer_objects(copy=False)
     try:
-        worksheet.append_rows(
-            [cleaned_df.columns.tolist()] + cleaned_df.astype(str).values.tolist(),
-            value_input_option="USER_ENTERED"
-        )
+        sheets.with_worksheet(SHEET_ID, sheet_name, lambda ws: sync_dataframe(ws, cleaned_df.astype(str)))
         print(f"✅ Updated sheet: {sheet_name}")
     except Exception as e:
         print(f"❌ Failed to update sheet {sheet_name}: {e}")
@@ -1,29 +1,17 @@
 import os
 import io
-import pandas as pd
-import requests
-import gspread
 from dotenv import load_dotenv
-from google.oauth2.service_account import Credentials
-import time
-from requests.exceptions import SSLError
-import numpy as np
-import os, io, requests, json
-import pandas as pd
-from typing import List
-import gspread, time
-from requests.exceptions import SSLError
-from dotenv import load_dotenv
-from google.oauth2.service_account import Credentials
-from google.oauth2.service_account import Credentials
-from google.auth.transport.requests import Request
-from src.utils.credentials import get_credentials_with_retry
-import time
-import numpy as np
-import gspread
-from google.auth.exceptions import TransportError
-from gspread.exceptions import APIError
-from tenacity import retry, wait_exponential, stop_after_attempt, retry_if_exception_type
+from src.utils.lazy import lazy_import
+from src.utils.sheets_client import sheets
+from src.utils.report_source import get_report_source
+from src.utils.sheet_sync import sync_dataframe, sync_rows
+from src.utils.snapshots import load_frames, register_artifact
+from src.utils.single_flight import single_flight
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+gspread_exceptions = lazy_import("gspread.exceptions")
 
 
 # Load environment variables
@@ -38,7 +26,7 @@ SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 REPO_OWNER = "lawallanre00490038"
 REPO_NAME = "dsn-voice"
-RAW_FILE_URL = f"https://raw.githubusercontent.com/{REPO_OWNER}/{REPO_NAME}/main/reports/audio_data_summary.xlsx"
+AUDIO_SUMMARY_PATH = "reports/audio_data_summary.xlsx"
 HEADERS = {"Authorization": f"token {GITHUB_TOKEN}"}
 
 
@@ -53,78 +41,93 @@ SHEET_IDS_BY_LANG = {
 
 
 
-def fetch_excel_from_github() -> pd.ExcelFile:
-    """Download and load the Excel file directly from GitHub."""
-    response = requests.get(RAW_FILE_URL, headers=HEADERS)
-    if response.status_code != 200:
-        raise Exception(f"Failed to fetch file: {response.status_code}")
-    return pd.ExcelFile(io.BytesIO(response.content))
+@single_flight()
+def fetch_excel_from_github() -> bytes:
+    """Load the Excel file from the report source (local clone or GitHub)."""
+    try:
+        return get_report_source().read_bytes(AUDIO_SUMMARY_PATH)
+    except Exception as e:
+        raise Exception(f"Failed to fetch file: {e}")
 
 
+def parse_audio_summary(content: bytes) -> dict:
+    return pd.read_excel(io.BytesIO(content), sheet_name=None)
 
-@retry(
-    retry=retry_if_exception_type(APIError),
-    wait=wait_exponential(multiplier=2, min=4, max=20),
-    stop=stop_after_attempt(5),
-)
-def append_chunk(worksheet, chunk):
-    worksheet.append_rows(chunk, value_input_option="USER_ENTERED")
 
-def write_sheet_to_workbook(sheet_id: str, df: pd.DataFrame, tab_name: str = "Sheet1"):
-    """Write DataFrame to a specific tab in a workbook with retry + chunking."""
-    credentials = get_credentials_with_retry()
-    gc = gspread.authorize(credentials)
+register_artifact(AUDIO_SUMMARY_PATH, parse_audio_summary, "all-sheets")
+
 
-    try:
-        worksheet = gc.open_by_key(sheet_id).worksheet(tab_name)
-    except gspread.exceptions.WorksheetNotFound:
-        worksheet = gc.open_by_key(sheet_id).add_worksheet(title=tab_name, rows="1000", cols="20")
 
-    worksheet.clear()
+# Parallel sheet writes during a fan-out; the Sheets scheduler still holds them to the quota
+FANOUT_WORKERS = int(os.getenv("SHEETS_FANOUT_WORKERS", "8"))
 
+
+def load_audio_summary_sheets() -> dict:
+    """Fetch audio_data_summary.xlsx once; every sheet comes from its snapshot unless the file changed."""
+    return load_frames(AUDIO_SUMMARY_PATH, fetch_excel_from_github(), parse_audio_summary, "all-sheets")
+
+
+def write_sheet_to_workbook(sheet_id: str, df: "pd.DataFrame", tab_name: str = "Sheet1"):
+    """Write DataFrame to a specific tab in a workbook, sending only the cells that changed."""
     if df.empty:
-        print(f"⚠️ DataFrame for {sheet_id} is empty, skipping...")
+        print(f"⚠️ DataFrame for {sheet_id} is empty, clearing tab...")
+        sheets.with_worksheet(sheet_id, tab_name, lambda ws: sync_rows(ws, []))
         return
 
     df = df.replace({np.nan: ""})  # Avoid NaNs that break JSON
-    header = [df.columns.tolist()]
-    data_rows = df.values.tolist()
+    try:
+        sheets.with_worksheet(sheet_id, tab_name, lambda ws: sync_dataframe(ws, df))
+    except gspread_exceptions.APIError as e:
+        print(f"❌ Failed to sync {sheet_id}/{tab_name}: {e}")
+        raise
+
+    print(f"✅ Finished writing to sheet {sheet_id}/{tab_name}.")
 
-    print("📤 Appending header...")
-    append_chunk(worksheet, header)
 
-    chunk_size = 5000
-    for i in range(0, len(data_rows), chunk_size):
-        chunk = data_rows[i:i + chunk_size]
-        try:
-            print(f"📤 Appending rows {i} to {i + len(chunk)}...")
-            append_chunk(worksheet, chunk)
-            time.sleep(1.5)  # Optional: pause to avoid quota hit
-        except APIError as e:
-            print(f"❌ Failed to append rows {i}-{i+len(chunk)}: {e}")
-            raise
+def write_workbooks_concurrently(writes: list, progress=None):
+    """Run (sheet_id, df, tab) writes in parallel; raises after all finish if any failed."""
+    failures = []
+    for sheet_id, df, tab in writes:
+        print(f"📝 Writing {len(df)} rows to {sheet_id}/{tab}")
+    with ThreadPoolExecutor(max_workers=max(1, min(FANOUT_WORKERS, len(writes)))) as pool:
+        futures = {pool.submit(write_sheet_to_workbook, *write): write for write in writes}
+        for done, future in enumerate(as_completed(futures), start=1):
+            sheet_id, _, tab = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                print(f"❌ Failed to write {sheet_id}/{tab}: {e}")
+                failures.append(f"{sheet_id}/{tab}: {e}")
+            if progress:
+                progress(f"{done}/{len(writes)} sheets written")
 
-    print("✅ Finished writing to sheet.")
+    if failures:
+        raise Exception(f"{len(failures)} of {len(writes)} sheet writes failed: {'; '.join(failures)}")
 
 
+def combined_workbook_writes(all_sheets: dict) -> list:
+    if not SHEET_ID:
+        print("⚠️ No combined Sheet ID configured, skipping...")
+        return []
+    return [(SHEET_ID, df, lang.lower()) for lang, df in all_sheets.items()]
 
 
-def push_all_audio_summary_sheets_multiple():
-    """Push each Excel sheet to its corresponding Google Sheet workbook."""
-    excel_data = fetch_excel_from_github()
-    all_sheets = pd.read_excel(excel_data, sheet_name=None)
 
+
+def push_all_audio_summary_sheets_multiple(progress=None):
+    """Push each Excel sheet to its own workbook and to the combined workbook, all in parallel."""
+    all_sheets = load_audio_summary_sheets()
+
+    writes = []
     for lang, df in all_sheets.items():
         sheet_id = SHEET_IDS_BY_LANG.get(lang.lower())
-        print("The sheet id is:", sheet_id, lang, df.columns)
         if not sheet_id:
             print(f"⚠️ No Sheet ID found for language: {lang}, skipping...")
             continue
+        writes.append((sheet_id, df, "main"))
 
-        print(f"📝 Writing to workbook: {lang} ({len(df)} rows)")
-        write_sheet_to_workbook(sheet_id, df, "main")
-
-    push_all_audio_summary_sheets()
+    writes.extend(combined_workbook_writes(all_sheets))
+    write_workbooks_concurrently(writes, progress=progress)
 
     print("✅ All sheets written successfully.")
 
@@ -132,21 +135,9 @@ def push_all_audio_summary_sheets_multiple():
 
 
 
-def push_all_audio_summary_sheets():
-    excel_data = fetch_excel_from_github()
-    all_sheets = pd.read_excel(excel_data, sheet_name=None)
-
-    for lang, df in all_sheets.items():
-        if not SHEET_ID:
-            print(f"⚠️ No Sheet ID found for language: {lang}, skipping...")
-            continue
-
-         # Mine
-        print(f"📝 Writing {len(df)} rows to tab: {lang}")
-        write_sheet_to_workbook(SHEET_ID, df, lang.lower())
+def push_all_audio_summary_sheets(progress=None):
+    all_sheets = load_audio_summary_sheets()
+    write_workbooks_concurrently(combined_workbook_writes(all_sheets), progress=progress)
 
-
-        
     print("✅ All sheets written successfully.")
     return("✅ All sheets written successfully.")
-
@@ -1,15 +1,28 @@
-import requests
 import os
+import subprocess
+from pathlib import Path
 from dotenv import load_dotenv
+from src.utils.http_cache import cached_get
+from src.utils.lazy import lazy_import
+
+requests = lazy_import("requests")
 
 load_dotenv()
 TOKEN = os.getenv("GITHUB_TOKEN")
 
 REPO_OWNER = "lawallanre00490038"
 REPO_NAME = "dsn-voice"
+BRANCH = "main"
 BASE_API = f"https://api.github.com/repos/{REPO_OWNER}/{REPO_NAME}/contents/annotators"
+TREES_API = f"https://api.github.com/repos/{REPO_OWNER}/{REPO_NAME}/git/trees"
 AUDIO_EXTENSIONS = {".wav", ".mp3", ".m4a", ".ogg"}
 
+REPO_PATH = Path(os.getenv("REPO_PATH", "./dsn-voice")).resolve()
+ANNOTATORS_DIR = "annotators"
+
+# "local" (git ls-tree on the clone), "tree" (one recursive tree request) or "contents" (legacy walk)
+COUNT_MODE = os.getenv("AUDIO_COUNT_MODE")
+
 headers = {
     "Authorization": f"token {TOKEN}"
 }
@@ -21,7 +34,7 @@ def count_files_in_folder(folder_url):
     audio_count = 0
     subfolder_breakdown = {}
 
-    response = requests.get(folder_url, headers=headers)
+    response = cached_get(folder_url, headers=headers)
     if response.status_code != 200:
         return 0, {}
 
@@ -39,9 +52,86 @@ def count_files_in_folder(folder_url):
 
     return audio_count, subfolder_breakdown
 
-def count_audio_files_deep():
+
+def summarize_audio_tree(entries):
+    """
+    Count audio files from a flat listing of (path, is_dir) entries, paths relative to annotators/.
+    Returns the same {annotator: {total_audio, subfolders}} shape as the recursive walk.
+    """
+    result = {}
+    for path, is_dir in entries:
+        parts = path.strip("/").split("/")
+        annotator = parts[0]
+        if len(parts) == 1:
+            if is_dir:
+                result.setdefault(annotator, {"total_audio": 0, "subfolders": {}})
+            continue
+
+        entry = result.setdefault(annotator, {"total_audio": 0, "subfolders": {}})
+        subfolder = parts[1] if len(parts) > 2 or is_dir else None
+        if subfolder is not None:
+            entry["subfolders"].setdefault(subfolder, 0)
+
+        if not is_dir and is_audio_file(parts[-1]):
+            entry["total_audio"] += 1
+            if subfolder is not None:
+                entry["subfolders"][subfolder] += 1
+
+    return result
+
+
+def list_annotators_tree_remote():
+    """List the annotators/ subtree with the git trees API: two requests regardless of folder count."""
+    root = cached_get(f"{TREES_API}/{BRANCH}", headers=headers)
+    root.raise_for_status()
+    tree_sha = next(
+        (e["sha"] for e in root.json()["tree"] if e["path"] == ANNOTATORS_DIR and e["type"] == "tree"),
+        None,
+    )
+    if tree_sha is None:
+        raise FileNotFoundError(f"No '{ANNOTATORS_DIR}' folder on {BRANCH}")
+
+    res = cached_get(f"{TREES_API}/{tree_sha}", headers=headers, params={"recursive": "1"})
+    res.raise_for_status()
+    body = res.json()
+
+    if not body.get("truncated"):
+        return [(e["path"], e["type"] == "tree") for e in body["tree"]]
+
+    # GitHub caps recursive listings; fall back to one recursive listing per annotator
+    print("⚠️ Tree listing truncated, listing annotators one by one")
+    top = cached_get(f"{TREES_API}/{tree_sha}", headers=headers)
+    top.raise_for_status()
+    entries = []
+    for item in top.json()["tree"]:
+        entries.append((item["path"], item["type"] == "tree"))
+        if item["type"] != "tree":
+            continue
+        sub = cached_get(f"{TREES_API}/{item['sha']}", headers=headers, params={"recursive": "1"})
+        sub.raise_for_status()
+        entries.extend((f"{item['path']}/{e['path']}", e["type"] == "tree") for e in sub.json()["tree"])
+    return entries
+
+
+def list_annotators_tree_local(repo_path: Path = REPO_PATH):
+    """List the annotators/ subtree from the local clone; works on sparse, blob-less checkouts."""
+    out = subprocess.run(
+        ["git", "ls-tree", "-r", "-t", "HEAD", "--", ANNOTATORS_DIR],
+        cwd=repo_path, check=True, capture_output=True, text=True,
+    ).stdout
+
+    entries = []
+    prefix = f"{ANNOTATORS_DIR}/"
+    for line in out.splitlines():
+        meta, path = line.split("\t", 1)
+        if path.startswith(prefix):
+            entries.append((path[len(prefix):], meta.split()[1] == "tree"))
+    return entries
+
+
+def count_audio_files_walk():
     result = {}
-    response = requests.get(BASE_API, headers=headers)
+    response = cached_get(BASE_API, headers=headers)
     if response.status_code != 200:
         return {"error": "Failed to fetch annotator folders", "details": response.text}
 
@@ -58,3 +148,18 @@ def count_audio_files_deep():
             }
 
     return result
+
+
+def count_audio_files_deep(mode: str = None):
+    mode = mode or COUNT_MODE or ("local" if (REPO_PATH / ".git").exists() else "tree")
+    print(f"Counting audio files using '{mode}' listing...")
+
+    if mode == "contents":
+        return count_audio_files_walk()
+
+    try:
+        entries = list_annotators_tree_local() if mode == "local" else list_annotators_tree_remote()
+    except (requests.RequestException, subprocess.CalledProcessError, FileNotFoundError) as e:
+        return {"error": "Failed to list annotator folders", "details": str(e)}
+
+    return summarize_audio_tree(entries)
@@ -1,14 +1,14 @@
-import base64
-import json 
-import os, json, io, base64, time
-import requests
-import pandas as pd
+import os, io
 from dotenv import load_dotenv
-import gspread
-from src.utils.credentials import get_credentials_with_retry
-from gspread.exceptions import APIError, WorksheetNotFound
+from src.utils.sheets_client import sheets
+from src.utils.sheet_sync import sync_rows
+from src.utils.http_cache import cached_get
+from src.utils.lazy import lazy_import
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
+pd = lazy_import("pandas")
+requests = lazy_import("requests")
+
 # Load environment variables
 load_dotenv()
 
@@ -35,22 +35,14 @@ SHEET_NAME = "annotated_count_summary"
 # Retry wrappers
 @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1.5), retry=retry_if_exception_type(Exception))
 def safe_get(url):
-    res = requests.get(url, headers=HEADERS)
+    res = cached_get(url, headers=HEADERS)
     res.raise_for_status()
     return res
 
 
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=2), retry=retry_if_exception_type(APIError))
 def safe_update(worksheet, headers, rows):
-    worksheet.batch_clear(["A1:E1000"])
-    worksheet.update("A1", [headers] + rows, value_input_option="USER_ENTERED")
-
-
+    sync_rows(worksheet, [headers] + rows)
 
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=2), retry=retry_if_exception_type(Exception))
-def safe_authorize():
-    creds = get_credentials_with_retry()
-    return gspread.authorize(creds)
 
 # 📥 Parse individual annotator TSV
 def parse_tsv(folder_name):
@@ -114,15 +106,6 @@ def get_folder_stats():
 # ✅ Write stats to Google Sheets
 def write_summary_to_sheet(data):
     for SHEET_ID in SHEET_IDS:
-        try:
-            client = safe_authorize()
-            sheet = client.open_by_key(SHEET_ID).worksheet(SHEET_NAME)
-        except WorksheetNotFound:
-            sheet = client.open_by_key(SHEET_ID).add_worksheet(title=SHEET_NAME, rows="1000", cols="5")
-        except Exception as e:
-            print(f"❌ Could not access sheet: {e}")
-            return
-
         headers = ["Annotator", "Total Sentences", "Presented", "Recorded", "Invalid"]
         rows = []
 
@@ -137,7 +120,7 @@ def write_summary_to_sheet(data):
             rows.append([annotator, total, presented, recorded, invalid])
 
         try:
-            safe_update(sheet, headers, rows)
+            sheets.with_worksheet(SHEET_ID, SHEET_NAME, lambda ws: safe_update(ws, headers, rows), cols="5")
             print("✅ Sheet updated successfully.")
         except Exception as e:
             print(f"❌ Failed to update sheet: {e}")
@@ -1,31 +1,32 @@
-from google.oauth2.service_account import Credentials
+import os
+import json
 import time
-from requests.exceptions import SSLError
-import numpy as np
-import os, io, requests, json
-import pandas as pd
-from typing import List
-import gspread, time
-from requests.exceptions import SSLError
-from google.oauth2.service_account import Credentials
-import google.auth.exceptions
 import base64
+from functools import lru_cache
+from src.utils.lazy import lazy_import
 
-SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
-b64_creds = os.getenv("GOOGLE_CREDS_B64")
+service_account = lazy_import("google.oauth2.service_account")
+google_auth_exceptions = lazy_import("google.auth.exceptions")
+requests_exceptions = lazy_import("requests.exceptions")
 
-if not b64_creds:
-    raise Exception("Missing GOOGLE_CREDS_B64 in environment.")
+SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
 
-creds_dict = json.loads(base64.b64decode(b64_creds).decode("utf-8"))
 
+@lru_cache(maxsize=1)
+def load_creds_dict() -> dict:
+    """Service-account info from GOOGLE_CREDS_B64, decoded the first time Google is actually called."""
+    b64_creds = os.getenv("GOOGLE_CREDS_B64")
+    if not b64_creds:
+        raise Exception("Missing GOOGLE_CREDS_B64 in environment.")
+    return json.loads(base64.b64decode(b64_creds).decode("utf-8"))
 
 
 def get_credentials_with_retry(retries=3):
+    creds_dict = load_creds_dict()
     for i in range(retries):
         try:
-            return Credentials.from_service_account_info(creds_dict, scopes=SCOPES)
-        except (google.auth.exceptions.TransportError, SSLError) as e:
+            return service_account.Credentials.from_service_account_info(creds_dict, scopes=SCOPES)
+        except (google_auth_exceptions.TransportError, requests_exceptions.SSLError) as e:
             print(f"Retrying auth ({i+1}/{retries}): {e}")
             time.sleep(2 ** i)
     raise Exception("Failed to authenticate after retries.")
@@ -0,0 +1,100 @@
+import os
+import asyncio
+import subprocess
+from pathlib import Path
+from typing import List, Optional
+
+REPO_PATH = Path(os.getenv("REPO_PATH", "./dsn-voice")).resolve()
+REPO_URL = "https://github.com/abumafrim/dsn-voice.git"
+BRANCH = "main"
+SPARSE_PATHS = ["reports"]
+
+# Seconds before a hung git command (e.g. a stalled fetch) is killed
+GIT_TIMEOUT = float(os.getenv("GIT_TIMEOUT", "300"))
+
+
+async def run_git(*args: str, cwd: Optional[Path] = None, timeout: float = GIT_TIMEOUT) -> str:
+    """Run git without blocking the event loop; raises CalledProcessError like subprocess.run(check=True)."""
+    cmd = ["git", *args]
+    proc = await asyncio.create_subprocess_exec(
+        *cmd, cwd=cwd,
+        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+        env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+    except (asyncio.TimeoutError, asyncio.CancelledError):
+        proc.kill()
+        await proc.wait()
+        raise
+
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, stdout.decode(), stderr.decode())
+    return stdout.decode()
+
+
+async def head_sha(repo_path: Path = REPO_PATH) -> str:
+    return (await run_git("rev-parse", "HEAD", cwd=repo_path)).strip()
+
+
+async def changed_paths(repo_path: Path, old_sha: str, new_sha: str, path: str = ".") -> List[str]:
+    """
+    Repo-relative files under `path` touched between two commits (both sides of renames included).
+    Works on the shallow clone as long as both commits are still in the object store, which holds
+    for the previously checked-out commit; otherwise git fails and the caller re-ingests everything.
+    """
+    out = await run_git("diff", "--name-only", "--no-renames", old_sha, new_sha, "--", path, cwd=repo_path)
+    return [line for line in out.splitlines() if line]
+
+
+class RepoSync:
+    """
+    Keeps a shallow, blob-less, sparse clone of dsn-voice at the remote branch tip.
+
+    Concurrent sync() calls are coalesced: at most one fetch runs, and every call that arrives while
+    it runs shares the single fetch queued behind it (which is guaranteed to see their push). A burst
+    of N webhook deliveries therefore costs at most two fetches, and never blocks the event loop.
+    """
+
+    def __init__(self, path: Path = REPO_PATH, url: str = REPO_URL, branch: str = BRANCH):
+        self.path = Path(path)
+        self.url = url
+        self.branch = branch
+        self._lock = asyncio.Lock()
+        self._queued: Optional[asyncio.Task] = None
+
+    async def sync(self) -> str:
+        """Fetch and check out the branch tip; returns the new HEAD sha."""
+        if self._queued is None:
+            self._queued = asyncio.create_task(self._sync_after_current())
+        # A webhook request going away must not cancel the fetch other requests are waiting on
+        return await asyncio.shield(self._queued)
+
+    async def _sync_after_current(self) -> str:
+        async with self._lock:
+            # From here on, new callers queue the next fetch instead of joining this one
+            self._queued = None
+            if not (self.path / ".git").exists():
+                await self._clone()
+            else:
+                await self._fetch()
+            return await head_sha(self.path)
+
+    async def _clone(self):
+        print(f"📥 Cloning repository into {self.path}...")
+        await run_git(
+            "clone", "--filter=blob:none", "--no-checkout", "--depth=1",
+            "--branch", self.branch, self.url, str(self.path),
+        )
+        await run_git("sparse-checkout", "init", "--cone", cwd=self.path)
+        await run_git("sparse-checkout", "set", *SPARSE_PATHS, cwd=self.path)
+        await run_git("checkout", self.branch, cwd=self.path)
+
+    async def _fetch(self):
+        # Only the tip commit is transferred; reset instead of merge, the clone has no local changes
+        print(f"🔄 Fetching {self.branch} into {self.path}...")
+        await run_git("fetch", "--depth=1", "origin", self.branch, cwd=self.path)
+        await run_git("reset", "--hard", "FETCH_HEAD", cwd=self.path)
+
+
+repo_sync = RepoSync()
@@ -0,0 +1,57 @@
+import os
+import asyncio
+from dotenv import load_dotenv
+from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception
+from src.utils.http_cache import cached_get_async
+from src.utils.lazy import lazy_import
+
+httpx = lazy_import("httpx")
+
+load_dotenv()
+
+GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+HEADERS = {"Authorization": f"token {GITHUB_TOKEN}"}
+
+# Upper bound on in-flight GitHub requests (also the connection pool size)
+MAX_CONCURRENCY = int(os.getenv("GITHUB_MAX_CONCURRENCY", "16"))
+# Seconds for the whole request and for the connect phase
+TIMEOUT = 30.0
+CONNECT_TIMEOUT = 10.0
+
+
+def build_client(max_connections: int = MAX_CONCURRENCY) -> "httpx.AsyncClient":
+    """Pooled keep-alive client shared by every request of one fetch run."""
+    return httpx.AsyncClient(
+        headers=HEADERS,
+        timeout=httpx.Timeout(TIMEOUT, connect=CONNECT_TIMEOUT),
+        follow_redirects=True,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        ),
+    )
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    # Network errors, rate limiting and server errors are worth another try; 404s are not
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code == 429 or exc.response.status_code >= 500
+    return isinstance(exc, httpx.TransportError)
+
+
+@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1.5), retry=retry_if_exception(_is_retryable))
+async def async_safe_get(client: "httpx.AsyncClient", url: str) -> "httpx.Response":
+    res = await cached_get_async(client, url)
+    res.raise_for_status()
+    return res
+
+
+async def gather_bounded(coros, limit: int = MAX_CONCURRENCY) -> list:
+    """Run coroutines concurrently, at most `limit` at a time, preserving input order."""
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(coro):
+        async with semaphore:
+            return await coro
+
+    return await asyncio.gather(*(run(c) for c in coros))
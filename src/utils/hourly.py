@@ -1,13 +1,20 @@
 from fastapi import APIRouter, HTTPException
-import os, io, time, requests
-import pandas as pd
-import gspread
-import re
+import os, io, time
+import hashlib
+import threading
+from functools import cached_property
+from typing import Optional
 from dotenv import load_dotenv
-from google.oauth2.service_account import Credentials
-from src.utils.credentials import get_credentials_with_retry
+from src.utils.lazy import lazy_import
+from src.utils.sheets_client import sheets
+from src.utils.report_source import get_report_source
+from src.utils.sheet_sync import sync_dataframe
+from src.utils.repo_events import on_repo_update, touches
+from src.utils.snapshots import load_frames, register_artifact
+from src.utils.response_cache import cached_response
 
-import numpy as np
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
 
 load_dotenv()
 
@@ -15,7 +22,7 @@ hourly = APIRouter()
 
 # CONFIG
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
-EXCEL_URL = "https://raw.githubusercontent.com/lawallanre00490038/dsn-voice/main/reports/current_annotators_report.xlsx"
+EXCEL_PATH = "reports/current_annotators_report.xlsx"
 SHEET_IDS = [
     "1JW8mRPgOZ8xIgwq4EKvfd-uILPQCZCdfFgsJqDJ5Zmc",
     "1_GoSkWDpW-cfosDDSRTCsJYZyz1rR-wCSl4O3sif69s",
@@ -26,78 +33,124 @@ SHEET_IDS = [
 
 
 SHEET_NAME = "hourly_summary"
-SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
 
+# Seconds a parsed workbook is served from memory before its content hash is re-checked
+HOURLY_CACHE_TTL = float(os.getenv("HOURLY_CACHE_TTL", "3600"))
+SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
 
 
-def fetch_excel_from_github():
-    headers = {"Authorization": f"token {GITHUB_TOKEN}"}
-    response = requests.get(EXCEL_URL, headers=headers)
-    
-    if response.status_code != 200:
-        raise HTTPException(status_code=500, detail="❌ Failed to fetch Excel from GitHub")
 
-    try:
-        # Read read and unread sheets
-        read_df = pd.read_excel(io.BytesIO(response.content), sheet_name="read")
-        unread_df = pd.read_excel(io.BytesIO(response.content), sheet_name="unread")
+class HourlyReport:
+    """
+    The parsed 'read' and 'unread' sheets of one version of the workbook. The long (melted and merged)
+    form is only built when an endpoint asks for it. Accessors return copies, so callers can rename or
+    fill in place without corrupting the cached frames.
+    """
 
-        # Check column shape
-        if read_df.shape[1] < 2 or unread_df.shape[1] < 2:
-            raise HTTPException(status_code=500, detail="❌ 'read' or 'unread' sheet has insufficient columns")
+    def __init__(self, digest: str, read_df: "pd.DataFrame", unread_df: "pd.DataFrame"):
+        self.digest = digest
+        self.read_df = read_df
+        self.unread_df = unread_df
 
-        # Extract annotator column
-        annotator_col = read_df.columns[0]
+    @cached_property
+    def long_df(self) -> "pd.DataFrame":
+        annotator_col = self.read_df.columns[0]
 
         # Melt both sheets to long format (timestamp -> rows)
-        read_long = read_df.melt(id_vars=[annotator_col], var_name="timestamp", value_name="read_count")
-        unread_long = unread_df.melt(id_vars=[annotator_col], var_name="timestamp", value_name="unread_count")
+        read_long = self.read_df.melt(id_vars=[annotator_col], var_name="timestamp", value_name="read_count")
+        unread_long = self.unread_df.melt(id_vars=[annotator_col], var_name="timestamp", value_name="unread_count")
 
         # Merge long-form data
         df_long = pd.merge(read_long, unread_long, on=[annotator_col, "timestamp"], how="outer").fillna(0)
-
-        # Rename 'annotator' column explicitly
         df_long = df_long.rename(columns={annotator_col: "annotator"})
-
-        # Ensure numeric columns are of int type
         df_long["read_count"] = df_long["read_count"].astype(int)
         df_long["unread_count"] = df_long["unread_count"].astype(int)
+        return df_long
 
-        # Create wide format from read_df (optional, for hourly analysis)
-        wide_df = read_df.copy()
-        wide_df = wide_df.rename(columns={annotator_col: "annotator"})
+    def read(self) -> "pd.DataFrame":
+        return self.read_df.copy()
 
-        return df_long, read_df, unread_df, wide_df
+    def unread(self) -> "pd.DataFrame":
+        return self.unread_df.copy()
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"❌ Failed to parse Excel: {str(e)}")
+    def long(self) -> "pd.DataFrame":
+        return self.long_df.copy()
 
+    def wide(self) -> "pd.DataFrame":
+        return self.read_df.rename(columns={self.read_df.columns[0]: "annotator"})
 
-def write_sheet(sheet_name: str, df: pd.DataFrame):
-    creds = get_credentials_with_retry()
-    gc = gspread.authorize(creds)
 
-    for SHEET_ID in SHEET_IDS:
+def parse_read_unread(content: bytes) -> dict:
+    # One openpyxl pass over the workbook for both sheets
+    return pd.read_excel(io.BytesIO(content), sheet_name=["read", "unread"])
+
+
+register_artifact(EXCEL_PATH, parse_read_unread, "read-unread")
+
+
+def parse_hourly_report(content: bytes, digest: str) -> HourlyReport:
+    frames = load_frames(EXCEL_PATH, content, parse_read_unread, "read-unread", digest=digest)
+    read_df, unread_df = frames["read"], frames["unread"]
+
+    if read_df.shape[1] < 2 or unread_df.shape[1] < 2:
+        raise HTTPException(status_code=500, detail="❌ 'read' or 'unread' sheet has insufficient columns")
+    return HourlyReport(digest, read_df, unread_df)
+
+
+_report: Optional[HourlyReport] = None
+_loaded_at = 0.0
+_lock = threading.Lock()
+
+
+def load_hourly_report(max_age: float = HOURLY_CACHE_TTL) -> HourlyReport:
+    """
+    The current workbook, parsed at most once per content hash. Within `max_age` seconds of the last
+    check it is served from memory; after that the bytes are fetched again (cheap with the ETag cache)
+    and only re-parsed if they changed. A webhook push touching the workbook expires it immediately.
+    """
+    global _report, _loaded_at
+    with _lock:
+        if _report is not None and time.monotonic() - _loaded_at < max_age:
+            return _report
+
         try:
-            worksheet = gc.open_by_key(SHEET_ID).worksheet(sheet_name)
-        except gspread.exceptions.WorksheetNotFound:
-            worksheet = gc.open_by_key(SHEET_ID).add_worksheet(title=sheet_name, rows="1000", cols="20")
+            content = get_report_source().read_bytes(EXCEL_PATH)
+        except Exception:
+            raise HTTPException(status_code=500, detail="❌ Failed to fetch Excel from GitHub")
 
-        worksheet.clear()
-        worksheet.append_rows([df.columns.tolist()], value_input_option="USER_ENTERED")
+        digest = hashlib.sha256(content).hexdigest()
+        if _report is None or _report.digest != digest:
+            try:
+                _report = parse_hourly_report(content, digest)
+            except HTTPException:
+                raise
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"❌ Failed to parse Excel: {str(e)}")
+            print(f"📗 Parsed {EXCEL_PATH} ({digest[:12]})")
 
+        _loaded_at = time.monotonic()
+        return _report
+
+
+@on_repo_update
+def expire_hourly_report(paths):
+    global _loaded_at
+    if touches(paths, EXCEL_PATH):
+        with _lock:
+            _loaded_at = 0.0
+
+
+def write_sheet(sheet_name: str, df: "pd.DataFrame"):
+    for SHEET_ID in SHEET_IDS:
         # ✅ Clean all data before pushing
         df = df.replace({np.nan: ""}).fillna("")  # Remove NaNs and None safely
 
-        chunk_size = 500
-        for i in range(0, len(df), chunk_size):
-            chunk = df.iloc[i:i + chunk_size].values.tolist()
-            worksheet.append_rows(chunk, value_input_option="USER_ENTERED")
-            time.sleep(1)  # Avoid rate limit
+        # One row per annotator (first column), so match rows by it and send only changed cells
+        sheets.with_worksheet(SHEET_ID, sheet_name, lambda ws: sync_dataframe(ws, df, key_columns=[df.columns[0]]))
 
 
 
-def get_latest_hour_summary(read_df: pd.DataFrame, unread_df: pd.DataFrame, wide_df: pd.DataFrame) -> dict:
+def get_latest_hour_summary(read_df: "pd.DataFrame", unread_df: "pd.DataFrame", wide_df: "pd.DataFrame") -> dict:
     # Rename first column to 'annotator' if needed
     if read_df.columns[0] != "annotator":
         read_df.rename(columns={read_df.columns[0]: "annotator"}, inplace=True)
@@ -148,7 +201,8 @@ def get_latest_hour_summary(read_df: pd.DataFrame, unread_df: pd.DataFrame, wide
 
 @hourly.get("/hourly-summary")
 def get_hourly_summary():
-    df_long, read_df, unread_df, wide_df = fetch_excel_from_github()
+    report = load_hourly_report()
+    df_long, read_df, unread_df, wide_df = report.long(), report.read(), report.unread(), report.wide()
 
     write_sheet("hourly_summary_read", read_df)
     write_sheet("hourly_summary_unread", unread_df)
@@ -166,8 +220,9 @@ def get_hourly_summary():
 
 
 @hourly.get("/hourly-summary-read")
+@cached_response(ttl=300, depends_on=(EXCEL_PATH,))
 def get_hourly_summary_read():
-    _, read_df, _, _ = fetch_excel_from_github()
+    read_df = load_hourly_report().read()
 
     if read_df.columns[0] != "Annotator":
         read_df.rename(columns={read_df.columns[0]: "Annotator"}, inplace=True)
@@ -185,8 +240,9 @@ def get_hourly_summary_read():
 
 
 @hourly.get("/hourly-summary-unread")
+@cached_response(ttl=300, depends_on=(EXCEL_PATH,))
 def get_hourly_summary_unread():
-    _, _, unread_df, _ = fetch_excel_from_github()
+    unread_df = load_hourly_report().unread()
 
     if unread_df.columns[0] != "Annotator":
         unread_df.rename(columns={unread_df.columns[0]: "Annotator"}, inplace=True)
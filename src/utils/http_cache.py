@@ -0,0 +1,206 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+from typing import Optional, Tuple
+from src.utils.lazy import lazy_import
+
+httpx = lazy_import("httpx")
+requests = lazy_import("requests")
+
+# Where validated GitHub responses are kept between requests (and restarts)
+CACHE_DIR = Path(os.getenv("HTTP_CACHE_DIR", ".cache/http")).resolve()
+# Upper bound on the bodies kept on disk; 0 turns the cache off
+CACHE_MAX_BYTES = int(float(os.getenv("HTTP_CACHE_MAX_MB", "256")) * 1024 * 1024)
+
+# Response headers worth replaying on a 304 (the 304 itself carries no body or content type)
+KEPT_HEADERS = ("content-type", "etag", "last-modified")
+
+
+class HttpCache:
+    """
+    Bounded on-disk store of response bodies with their ETag / Last-Modified validators.
+    Entries live in <dir>/<key[:2]>/<key>.body plus a small .json with the validators;
+    the least recently used bodies are evicted once the store outgrows `max_bytes`.
+    """
+
+    def __init__(self, directory: Path = CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = None  # total body bytes on disk, computed on first store
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @staticmethod
+    def key(url: str, params: Optional[dict] = None) -> str:
+        query = json.dumps(sorted((params or {}).items()), default=str)
+        return hashlib.sha256(f"{url}?{query}".encode()).hexdigest()
+
+    def _paths(self, key: str) -> Tuple[Path, Path]:
+        folder = self.directory / key[:2]
+        return folder / f"{key}.json", folder / f"{key}.body"
+
+    def validators(self, key: str) -> dict:
+        """If-None-Match / If-Modified-Since headers for the cached entry, if there is one."""
+        if not self.enabled:
+            return {}
+        meta_path, body_path = self._paths(key)
+        try:
+            meta = json.loads(meta_path.read_text())
+        except (OSError, ValueError):
+            return {}
+        if not body_path.exists():
+            return {}
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last-modified"):
+            headers["If-Modified-Since"] = meta["last-modified"]
+        return headers
+
+    def load(self, key: str) -> Optional[Tuple[dict, bytes]]:
+        """(headers, body) of a cached entry, marking it recently used."""
+        meta_path, body_path = self._paths(key)
+        try:
+            meta = json.loads(meta_path.read_text())
+            body = body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        now = time.time()
+        try:
+            os.utime(body_path, (now, now))
+        except OSError:
+            pass
+        return meta, body
+
+    def store(self, key: str, headers, body: bytes):
+        """Keep a 200 response when it carries a validator GitHub will honour next time."""
+        meta = {name: headers[name] for name in KEPT_HEADERS if headers.get(name)}
+        if not self.enabled or not (meta.get("etag") or meta.get("last-modified")) or len(body) > self.max_bytes:
+            return
+
+        meta_path, body_path = self._paths(key)
+        body_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            previous = body_path.stat().st_size if body_path.exists() else 0
+            # Body first, validators last: a crash in between never pairs an ETag with the wrong body
+            suffix = f".{os.getpid()}-{threading.get_ident()}.tmp"
+            tmp = Path(f"{body_path}{suffix}")
+            tmp.write_bytes(body)
+            os.replace(tmp, body_path)
+            tmp = Path(f"{meta_path}{suffix}")
+            tmp.write_text(json.dumps(meta))
+            os.replace(tmp, meta_path)
+
+            self._size = self._disk_size() if self._size is None else self._size - previous + len(body)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _bodies(self):
+        return list(self.directory.glob("*/*.body")) if self.directory.exists() else []
+
+    def _disk_size(self) -> int:
+        return sum(p.stat().st_size for p in self._bodies())
+
+    def _evict(self):
+        # Trim to 90% so we don't evict on every store once full
+        target = self.max_bytes * 0.9
+        entries = []
+        for body_path in self._bodies():
+            try:
+                stat = body_path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, body_path))
+        entries.sort()
+
+        size = sum(e[1] for e in entries)
+        for _, entry_size, body_path in entries:
+            if size <= target:
+                break
+            for path in (body_path.with_suffix(".json"), body_path):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            size -= entry_size
+        self._size = size
+
+    def clear(self):
+        with self._lock:
+            for body_path in self._bodies():
+                for path in (body_path.with_suffix(".json"), body_path):
+                    try:
+                        path.unlink()
+                    except OSError:
+                        pass
+            self._size = 0
+
+
+http_cache = HttpCache()
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def session() -> "requests.Session":
+    """Keep-alive session for every synchronous GitHub call, created on first use."""
+    global _session
+    if _session is None:
+        # Threaded callers racing here must not each build (and leak) a pool of their own
+        with _session_lock:
+            if _session is None:
+                _session = requests.Session()
+    return _session
+
+
+def cached_get(url: str, headers: Optional[dict] = None, params: Optional[dict] = None, timeout: float = 30) -> "requests.Response":
+    """
+    requests.get with conditional revalidation. A 304 is answered from the disk cache as a regular
+    200 response (with `from_cache = True`), so callers can keep using .json() / .content / .text.
+    GitHub does not charge 304s against the API rate limit.
+    """
+    key = http_cache.key(url, params)
+    res = session().get(url, headers={**(headers or {}), **http_cache.validators(key)}, params=params, timeout=timeout)
+
+    if res.status_code == 304:
+        cached = http_cache.load(key)
+        if cached is not None:
+            meta, body = cached
+            res.status_code = 200
+            res.reason = "OK (cached)"
+            res.headers.update(meta)
+            res._content = body
+            res.from_cache = True
+            return res
+        # Entry vanished (evicted by another process) between the two steps: fetch it for real
+        res = session().get(url, headers=headers, params=params, timeout=timeout)
+
+    res.from_cache = False
+    if res.status_code == 200:
+        http_cache.store(key, res.headers, res.content)
+    return res
+
+
+async def cached_get_async(client: "httpx.AsyncClient", url: str, params: Optional[dict] = None) -> "httpx.Response":
+    """httpx counterpart of cached_get for the pooled GitHub client."""
+    key = http_cache.key(url, params)
+    res = await client.get(url, params=params, headers=http_cache.validators(key))
+
+    if res.status_code == 304:
+        cached = http_cache.load(key)
+        if cached is not None:
+            meta, body = cached
+            res = httpx.Response(200, headers=meta, content=body, request=res.request)
+            res.extensions["from_cache"] = True
+            return res
+        res = await client.get(url, params=params)
+
+    if res.status_code == 200:
+        http_cache.store(key, res.headers, res.content)
+    return res
@@ -0,0 +1,42 @@
+import importlib
+import threading
+from types import ModuleType
+
+
+class LazyModule(ModuleType):
+    """
+    Stand-in for a heavy module (pandas, gspread, google-auth, ...) that imports it on first
+    attribute access, so importing the app doesn't pay for libraries a request may never use.
+    Annotations naming its attributes must be strings, or they trigger the import at definition time.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_lock"] = threading.Lock()
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self) -> ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            with self.__dict__["_lazy_lock"]:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attr: str):
+        # Only reached for names not set on the stand-in itself
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_lazy_module"] is not None else "not loaded"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+def lazy_import(name: str) -> ModuleType:
+    """`pd = lazy_import("pandas")` in place of `import pandas as pd`; submodules work too ("gspread.utils")."""
+    return LazyModule(name)
@@ -0,0 +1,56 @@
+import time
+import threading
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate_per_minute` sustained, bursts of up to `capacity`.
+    The rate adapts AIMD-style: `slow_down()` halves it after a 429, `speed_up()` creeps back to the ceiling.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: float = None, min_rate_per_minute: float = None):
+        self.max_rate = rate_per_minute / 60.0
+        self.min_rate = (min_rate_per_minute if min_rate_per_minute is not None else max(1.0, rate_per_minute / 10)) / 60.0
+        self.rate = self.max_rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate_per_minute / 6)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, tokens: float = 1.0):
+        """Block until `tokens` are available, then take them."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def release(self, tokens: float = 1.0):
+        """Give back tokens that were acquired but not used."""
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + tokens)
+
+    def slow_down(self):
+        """Quota exceeded: halve the rate and empty the bucket so every waiting caller backs off together."""
+        with self._lock:
+            self._refill()
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = 0.0
+
+    def speed_up(self):
+        with self._lock:
+            if self.rate < self.max_rate:
+                self._refill()
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+    @property
+    def rate_per_minute(self) -> float:
+        return self.rate * 60
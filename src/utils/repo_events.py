@@ -0,0 +1,29 @@
+from typing import Callable, Iterable, List, Optional
+
+# Called with the repo-relative paths that changed, or None when anything may have changed
+RepoListener = Callable[[Optional[List[str]]], None]
+
+_listeners: List[RepoListener] = []
+
+
+def on_repo_update(listener: RepoListener) -> RepoListener:
+    """Register a callback to run after the webhook pulls new dsn-voice commits (usable as a decorator)."""
+    _listeners.append(listener)
+    return listener
+
+
+def notify_repo_update(paths: Optional[Iterable[str]] = None):
+    """Tell in-memory caches that the clone moved; one failing listener doesn't stop the others."""
+    paths = list(paths) if paths is not None else None
+    for listener in _listeners:
+        try:
+            listener(paths)
+        except Exception as e:
+            print(f"⚠️ Repo update listener {getattr(listener, '__name__', listener)} failed: {e}")
+
+
+def touches(paths: Optional[List[str]], *prefixes: str) -> bool:
+    """True when `paths` is unknown (None) or any of them is, or sits under, one of `prefixes`."""
+    if paths is None:
+        return True
+    return any(p == prefix or p.startswith(prefix.rstrip("/") + "/") for p in paths for prefix in prefixes)
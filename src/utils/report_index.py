@@ -0,0 +1,117 @@
+import os
+import time
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional
+from src.utils.report_source import get_report_source
+from src.utils.repo_events import on_repo_update, touches
+
+REPORTS_DIR = "reports"
+# Seconds before a read rebuilds the index anyway, for reports changed without a webhook (0 = never)
+REPORT_INDEX_TTL = float(os.getenv("REPORT_INDEX_TTL", "600"))
+
+
+class ReportTree:
+    """
+    Immutable snapshot of reports/<language>/<date>/<file>: the date folders of every language
+    (oldest first), its latest date and the files inside each folder. Lookups never hit the network.
+    """
+
+    def __init__(self, paths: List[str]):
+        manifest: Dict[str, Dict[str, List[str]]] = defaultdict(lambda: defaultdict(list))
+        for path in paths:
+            parts = path.split("/")
+            # Only reports/<language>/<date>/<file>; top-level files such as the xlsx summaries are skipped
+            if len(parts) == 4 and parts[0] == REPORTS_DIR:
+                _, language, folder, name = parts
+                manifest[language][folder].append(name)
+
+        self._files = {
+            language: {folder: sorted(names) for folder, names in folders.items()}
+            for language, folders in manifest.items()
+        }
+        self._dates = {language: sorted(folders) for language, folders in self._files.items()}
+
+    def languages(self) -> List[str]:
+        return sorted(self._dates)
+
+    def dates(self, language: str) -> List[str]:
+        return list(self._dates.get(language, []))
+
+    def latest(self, language: str) -> Optional[str]:
+        dates = self._dates.get(language)
+        return dates[-1] if dates else None
+
+    def files(self, language: str, date: str) -> List[str]:
+        return list(self._files.get(language, {}).get(date, []))
+
+    def has(self, language: str, date: str, name: str) -> bool:
+        return name in self._files.get(language, {}).get(date, ())
+
+
+class ReportIndex:
+    """
+    Process-wide ReportTree, built from the report source (a local walk of the clone or a GitHub
+    tree listing) at startup or on first use, expired and rebuilt whenever a push touches reports/
+    and, as a fallback for missed webhooks, rebuilt by the first read after REPORT_INDEX_TTL seconds.
+    Readers get the current snapshot, or wait for the rebuild once it has expired.
+    """
+
+    def __init__(self):
+        self._tree: Optional[ReportTree] = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+
+    def _fresh(self) -> Optional[ReportTree]:
+        tree = self._tree
+        if tree is None or (REPORT_INDEX_TTL > 0 and time.monotonic() - self._built_at > REPORT_INDEX_TTL):
+            return None
+        return tree
+
+    def _build_locked(self) -> ReportTree:
+        source = get_report_source()
+        tree = ReportTree(source.list_tree(REPORTS_DIR))
+        self._tree, self._built_at = tree, time.monotonic()
+        print(f"🗂️ Indexed reports of {len(tree.languages())} languages from the {source.name} source")
+        return tree
+
+    def build(self) -> ReportTree:
+        with self._lock:
+            return self._build_locked()
+
+    def _refresh(self) -> ReportTree:
+        with self._lock:
+            # Whoever held the lock before us may have just rebuilt it
+            return self._fresh() or self._build_locked()
+
+    def get(self) -> ReportTree:
+        return self._fresh() or self._refresh()
+
+    async def get_async(self) -> ReportTree:
+        return self._fresh() or await asyncio.to_thread(self._refresh)
+
+    def invalidate(self):
+        self._tree = None
+
+
+report_index = ReportIndex()
+
+
+@on_repo_update
+def refresh_report_index(paths):
+    if not touches(paths, REPORTS_DIR):
+        return
+    # Expire the snapshot right away: a reader arriving before the rebuild below finishes must wait
+    # for a listing of the new tree, or a cached route would store a result computed from the old one.
+    # The rebuild itself runs off the event loop, since even a local walk of a large clone would block it
+    report_index.invalidate()
+    threading.Thread(target=_rebuild, daemon=True).start()
+
+
+def _rebuild():
+    try:
+        report_index._refresh()  # a reader may already have listed the new tree
+    except Exception as e:
+        print(f"⚠️ Could not rebuild the report index: {e}")
+        report_index.invalidate()
@@ -0,0 +1,166 @@
+import os
+import asyncio
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import List, Optional
+from dotenv import load_dotenv
+from src.utils.http_cache import cached_get
+from src.utils.github_async import build_client, async_safe_get
+from src.utils.single_flight import flights
+from src.utils.lazy import lazy_import
+
+httpx = lazy_import("httpx")
+requests = lazy_import("requests")
+
+load_dotenv()
+
+GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+REPO_OWNER = "lawallanre00490038"
+REPO_NAME = "dsn-voice"
+BRANCH = "main"
+
+REPO_PATH = Path(os.getenv("REPO_PATH", "./dsn-voice")).resolve()
+
+# "local", "http", or unset to use the local clone whenever it has been checked out
+REPORT_SOURCE = os.getenv("REPORT_SOURCE")
+
+
+class ReportSource(ABC):
+    """Read-only view of the dsn-voice repository. Paths are repo-relative, e.g. 'reports/yoruba'."""
+
+    name = "base"
+
+    @abstractmethod
+    def read_bytes(self, path: str) -> bytes:
+        """Return the file content, raising FileNotFoundError when it does not exist."""
+
+    @abstractmethod
+    def list_tree(self, path: str) -> List[str]:
+        """Return the repo-relative paths of every file below `path`, raising FileNotFoundError when it does not exist."""
+
+    def read_text(self, path: str) -> str:
+        return self.read_bytes(path).decode("utf-8")
+
+    # Async counterparts for async routes; by default the sync call runs in a worker thread
+    async def read_bytes_async(self, path: str) -> bytes:
+        return await asyncio.to_thread(self.read_bytes, path)
+
+    async def read_text_async(self, path: str) -> str:
+        return (await self.read_bytes_async(path)).decode("utf-8")
+
+
+class LocalReportSource(ReportSource):
+    """Reads from the sparse checkout the GitHub webhook keeps up to date."""
+
+    name = "local"
+
+    def __init__(self, root: Path = REPO_PATH):
+        self.root = Path(root).resolve()
+
+    def _resolve(self, path: str) -> Path:
+        full = (self.root / path).resolve()
+        if full != self.root and self.root not in full.parents:
+            raise FileNotFoundError(path)
+        return full
+
+    def read_bytes(self, path: str) -> bytes:
+        return self._resolve(path).read_bytes()
+
+    def list_tree(self, path: str) -> List[str]:
+        folder = self._resolve(path)
+        if not folder.is_dir():
+            raise FileNotFoundError(path)
+        files = []
+        for dirpath, dirnames, filenames in os.walk(folder):
+            dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+            rel = Path(dirpath).relative_to(self.root).as_posix()
+            files.extend(f"{rel}/{name}" for name in filenames)
+        return sorted(files)
+
+
+class HttpReportSource(ReportSource):
+    """Reads through raw.githubusercontent.com and the Git Trees API."""
+
+    name = "http"
+
+    def __init__(self, owner: str = REPO_OWNER, repo: str = REPO_NAME, branch: str = BRANCH, token: Optional[str] = GITHUB_TOKEN):
+        self.raw_base = f"https://raw.githubusercontent.com/{owner}/{repo}/{branch}"
+        self.trees_base = f"https://api.github.com/repos/{owner}/{repo}/git/trees"
+        self.branch = branch
+        self.headers = {"Authorization": f"token {token}"}
+
+    def _get(self, url: str) -> "requests.Response":
+        # Concurrent reads of the same file (e.g. several dashboard tabs) share one download
+        return flights.do(("github", url), self._download, url)
+
+    def _download(self, url: str) -> "requests.Response":
+        res = cached_get(url, headers=self.headers)
+        if res.status_code == 404:
+            raise FileNotFoundError(url)
+        res.raise_for_status()
+        res.content  # read the body before the response is shared between threads
+        return res
+
+    def read_bytes(self, path: str) -> bytes:
+        return self._get(f"{self.raw_base}/{path}").content
+
+    def list_tree(self, path: str) -> List[str]:
+        # Walk down to the folder's tree sha one level at a time, then list it recursively in one call
+        sha = self.branch
+        for part in [p for p in path.strip("/").split("/") if p]:
+            entries = self._get(f"{self.trees_base}/{sha}").json()["tree"]
+            match = next((e for e in entries if e["path"] == part and e["type"] == "tree"), None)
+            if match is None:
+                raise FileNotFoundError(path)
+            sha = match["sha"]
+
+        tree = self._get(f"{self.trees_base}/{sha}?recursive=1").json()
+        if tree.get("truncated"):
+            print(f"⚠️ GitHub truncated the tree listing of {path}, the report index may be incomplete")
+        prefix = path.strip("/")
+        return sorted(f"{prefix}/{e['path']}" for e in tree["tree"] if e["type"] == "blob")
+
+    async def _get_async(self, url: str) -> "httpx.Response":
+        return await flights.do_async(("github", url), self._download_async, url)
+
+    async def _download_async(self, url: str) -> "httpx.Response":
+        try:
+            return await async_safe_get(async_client(), url)
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                raise FileNotFoundError(url)
+            raise
+
+    async def read_bytes_async(self, path: str) -> bytes:
+        return (await self._get_async(f"{self.raw_base}/{path}")).content
+
+
+_client: Optional["httpx.AsyncClient"] = None
+
+
+def async_client() -> "httpx.AsyncClient":
+    """Keep-alive GitHub client shared by every async request of the app (bounded connection pool)."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = build_client()
+    return _client
+
+
+async def close_async_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+_source: Optional[ReportSource] = None
+
+
+def get_report_source() -> ReportSource:
+    """Process-wide report source; in auto mode it switches to the clone once the webhook has created it."""
+    global _source
+    mode = REPORT_SOURCE or ("local" if (REPO_PATH / "reports").is_dir() else "http")
+    if _source is None or _source.name != mode:
+        _source = LocalReportSource() if mode == "local" else HttpReportSource()
+        print(f"📚 Reading reports from the {_source.name} source")
+    return _source
@@ -0,0 +1,149 @@
+import os
+import time
+import asyncio
+import functools
+import inspect
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from starlette.concurrency import run_in_threadpool
+from src.utils.repo_events import on_repo_update, touches
+
+# Rendered responses kept in memory across all cached routes (least recently used evicted first)
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE", "on").lower() not in ("off", "0", "false")
+
+
+class CachedResponse:
+    __slots__ = ("body", "fresh_until", "stale_until", "depends_on")
+
+    def __init__(self, body: bytes, fresh_until: float, stale_until: float, depends_on: Optional[Tuple[str, ...]]):
+        self.body = body
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+        self.depends_on = depends_on
+
+
+class ResponseCache:
+    """
+    Bounded LRU of rendered JSON bodies keyed by (route, params), with stale-while-revalidate:
+    fresh entries are served as is, stale ones are served while a single background task refreshes
+    them, and missing or expired ones are computed once for all concurrent callers.
+    Lives on the event loop, so no locking is needed.
+    """
+
+    def __init__(self, maxsize: int = RESPONSE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[tuple, CachedResponse]" = OrderedDict()
+        self._inflight: Dict[tuple, asyncio.Task] = {}
+        self._inflight_deps: Dict[tuple, Optional[Tuple[str, ...]]] = {}
+
+    def get(self, key: tuple) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: tuple, entry: CachedResponse):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def refresh(self, key: tuple, compute: Callable, ttl: float, stale_ttl: float, depends_on) -> asyncio.Task:
+        """The task (re)filling `key`; callers arriving while it runs share it."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fill(key, compute, ttl, stale_ttl, depends_on))
+            self._inflight[key] = task
+            self._inflight_deps[key] = depends_on
+            task.add_done_callback(lambda t: self._done(key, t))
+        return task
+
+    async def _fill(self, key, compute, ttl, stale_ttl, depends_on):
+        result = await compute()
+        if isinstance(result, Response):
+            return result  # the route built its own response; nothing to cache
+        body = JSONResponse(content=jsonable_encoder(result)).body
+        now = time.monotonic()
+        entry = CachedResponse(body, now + ttl, now + ttl + stale_ttl, depends_on)
+        # A push invalidated the key while this ran: its callers get the result, the cache doesn't
+        if self._inflight.get(key) is asyncio.current_task():
+            self.put(key, entry)
+        return entry
+
+    def _done(self, key: tuple, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+            del self._inflight_deps[key]
+        if not task.cancelled() and task.exception() is not None and key in self._entries:
+            # Background refresh failed: keep serving the stale body until it expires
+            print(f"⚠️ Refreshing cached {key[0]} failed: {task.exception()!r}")
+
+    def invalidate(self, paths=None):
+        """
+        Drop entries depending on `paths`, so the next request recomputes them instead of being
+        served the pre-push body, and detach fills already running for them from the cache.
+        """
+        def affected(depends_on) -> bool:
+            return depends_on is None or touches(paths, *depends_on)
+
+        for key in [key for key, entry in self._entries.items() if affected(entry.depends_on)]:
+            del self._entries[key]
+        for key in [key for key, depends_on in self._inflight_deps.items() if affected(depends_on)]:
+            self._inflight.pop(key, None)
+            del self._inflight_deps[key]
+
+    def clear(self):
+        self._entries.clear()
+
+
+response_cache = ResponseCache()
+
+
+@on_repo_update
+def invalidate_cached_responses(paths):
+    response_cache.invalidate(paths)
+
+
+def cached_response(ttl: float, stale_ttl: float = 3600, depends_on: Optional[Tuple[str, ...]] = None):
+    """
+    Cache a JSON GET route's rendered response for `ttl` seconds, then serve it stale for up to
+    `stale_ttl` more while it is refreshed in the background. `depends_on` lists the repo paths the
+    route reads; a push touching them marks its entries stale (None: any push does).
+    Works on sync and async routes; the X-Cache header tells hit, stale or miss apart.
+    """
+    def decorator(func):
+        is_async = inspect.iscoroutinefunction(func)
+
+        @functools.wraps(func)
+        async def wrapper(**kwargs):
+            async def compute():
+                if is_async:
+                    return await func(**kwargs)
+                return await run_in_threadpool(func, **kwargs)
+
+            if not RESPONSE_CACHE_ENABLED:
+                return await compute()
+
+            key = (func.__qualname__, tuple(sorted((name, repr(value)) for name, value in kwargs.items())))
+            now = time.monotonic()
+            entry = response_cache.get(key)
+            if entry is not None and now < entry.fresh_until:
+                status = "hit"
+            elif entry is not None and now < entry.stale_until:
+                status = "stale"
+                response_cache.refresh(key, compute, ttl, stale_ttl, depends_on)
+            else:
+                status = "miss"
+                # Shielded: a client hanging up doesn't cancel the fill other clients are waiting on
+                entry = await asyncio.shield(response_cache.refresh(key, compute, ttl, stale_ttl, depends_on))
+                if isinstance(entry, Response):
+                    return entry
+
+            return Response(content=entry.body, media_type="application/json", headers={"X-Cache": status})
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,194 @@
+import re
+import math
+from datetime import date, datetime
+from typing import List, Optional, Sequence
+from src.utils.lazy import lazy_import
+from src.utils.sheets_scheduler import scheduler
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+gspread_utils = lazy_import("gspread.utils")
+
+# Keep first-time full writes within the Sheets API request size limits
+MAX_BLOCK_ROWS = 5000
+MAX_CELLS_PER_REQUEST = 100_000
+
+# "2025-06-01 10:00:00", "6/1/2025 10:00:00": worth parsing as a timestamp before comparing
+DATE_LIKE = re.compile(r"^\d{1,4}[-/.]\d{1,2}[-/.]\d{1,4}")
+
+
+def to_cell(value):
+    """Convert a DataFrame value into something the Sheets API accepts as JSON."""
+    if value is None:
+        return ""
+    if isinstance(value, (np.bool_, bool)):
+        return bool(value)
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, (np.floating, float)):
+        return "" if math.isnan(value) else float(value)
+    if value is pd.NaT:
+        return ""
+    if isinstance(value, (pd.Timestamp, np.datetime64, datetime, date)):
+        return "" if pd.isna(value) else str(pd.Timestamp(value))
+    return value
+
+
+def _as_timestamp(value) -> Optional["pd.Timestamp"]:
+    """The timestamp a cell stands for (sheet display strings included), or None for non-dates."""
+    if not isinstance(value, str) or not DATE_LIKE.match(value.strip()):
+        return None
+    try:
+        ts = pd.Timestamp(value.strip())
+    except (ValueError, TypeError):
+        return None
+    return None if pd.isna(ts) else ts
+
+
+def same_cell(current: str, new) -> bool:
+    """Compare a formatted sheet value against the value we are about to write."""
+    if isinstance(new, bool):
+        return current.upper() == ("TRUE" if new else "FALSE")
+    new_str = str(new)
+    if current == new_str:
+        return True
+    # "1,234.50" on the sheet is the same as 1234.5 in the frame (USER_ENTERED parses numeric text too)
+    try:
+        return float(current.replace(",", "")) == float(new_str)
+    except ValueError:
+        pass
+    # Timestamps are written as "2025-06-01 10:00:00" and read back in the sheet's date format
+    new_ts = _as_timestamp(new_str)
+    return new_ts is not None and _as_timestamp(current) == new_ts
+
+
+def _key_of(value, kind: str) -> str:
+    value = to_cell(value)
+    if kind == "number":
+        try:
+            return repr(float(str(value).replace(",", "")))
+        except ValueError:
+            pass
+    elif kind == "datetime":
+        ts = _as_timestamp(str(value))
+        if ts is not None:
+            return str(ts)
+    return str(value)
+
+
+def _keyed(rows: Sequence[Sequence], key_idx: List[int], kinds: Sequence[str]) -> list:
+    # (key values, occurrence) so duplicate keys still line up one-to-one
+    seen = {}
+    keys = []
+    for row in rows:
+        key = tuple(_key_of(row[i], kind) if i < len(row) else "" for i, kind in zip(key_idx, kinds))
+        seen[key] = seen.get(key, 0) + 1
+        keys.append((key, seen[key]))
+    return keys
+
+
+def order_like_sheet(current_rows: Sequence[Sequence], new_rows: List[list], key_idx: List[int], kinds: Optional[Sequence[str]] = None) -> List[list]:
+    """
+    Keep rows already on the sheet where they are, append new keys at the end, drop removed keys.
+    `kinds` ("number", "datetime" or "text" per key column) says how sheet display strings are matched.
+    """
+    kinds = kinds or ["text"] * len(key_idx)
+    by_key = dict(zip(_keyed(new_rows, key_idx, kinds), new_rows))
+    ordered = [by_key.pop(key) for key in _keyed(current_rows, key_idx, kinds) if key in by_key]
+    return ordered + list(by_key.values())
+
+
+def key_kind(column: "pd.Series") -> str:
+    """How a key column's values show up on the sheet: formatted numbers, formatted dates or plain text."""
+    if pd.api.types.is_bool_dtype(column):
+        return "text"
+    if pd.api.types.is_numeric_dtype(column):
+        return "number"
+    if pd.api.types.is_datetime64_any_dtype(column):
+        return "datetime"
+    return "text"
+
+
+def diff_ranges(current: Sequence[Sequence[str]], target: Sequence[Sequence]) -> List[dict]:
+    """
+    Changed cells between two grids as batch_update payloads. Changed runs within a row become one
+    range, and identical runs on consecutive rows are merged into one block.
+    """
+    updates = []
+    last = None  # (first_row, last_row, first_col, last_col) of updates[-1]
+
+    for r in range(max(len(current), len(target))):
+        old = current[r] if r < len(current) else []
+        new = target[r] if r < len(target) else []
+        width = max(len(old), len(new))
+
+        c = 0
+        while c < width:
+            if same_cell(old[c] if c < len(old) else "", new[c] if c < len(new) else ""):
+                c += 1
+                continue
+            start = c
+            while c < width and not same_cell(old[c] if c < len(old) else "", new[c] if c < len(new) else ""):
+                c += 1
+            values = [new[i] if i < len(new) else "" for i in range(start, c)]
+
+            if last and last[1] == r - 1 and last[2:] == (start, c - 1) and r - last[0] < MAX_BLOCK_ROWS:
+                updates[-1]["values"].append(values)
+                last = (last[0], r, start, c - 1)
+            else:
+                updates.append({"values": [values]})
+                last = (r, r, start, c - 1)
+            updates[-1]["range"] = f"{gspread_utils.rowcol_to_a1(last[0] + 1, start + 1)}:{gspread_utils.rowcol_to_a1(r + 1, c)}"
+
+    return updates
+
+
+def sync_rows(worksheet, target: List[list], current: Optional[List[List[str]]] = None) -> dict:
+    """
+    Make `worksheet` hold exactly `target` (header included), sending only the changed ranges.
+    Usually that is a single batch_update; very large rewrites are split by MAX_CELLS_PER_REQUEST.
+    All calls go through the Sheets scheduler, which handles quota and retries.
+    """
+    if current is None:
+        current = scheduler.read(worksheet.get_all_values)
+
+    updates = diff_ranges(current, target)
+    changed_cells = sum(len(u["values"]) * len(u["values"][0]) for u in updates)
+
+    if updates:
+        rows_needed = len(target)
+        cols_needed = max((len(row) for row in target), default=0)
+        if rows_needed > worksheet.row_count:
+            scheduler.write(worksheet.add_rows, rows_needed - worksheet.row_count)
+        if cols_needed > worksheet.col_count:
+            scheduler.write(worksheet.add_cols, cols_needed - worksheet.col_count)
+        batch, batch_cells = [], 0
+        for update in updates:
+            cells = len(update["values"]) * len(update["values"][0])
+            if batch and batch_cells + cells > MAX_CELLS_PER_REQUEST:
+                scheduler.update_values(worksheet, batch)
+                batch, batch_cells = [], 0
+            batch.append(update)
+            batch_cells += cells
+        scheduler.update_values(worksheet, batch)
+
+    print(f"🔁 {worksheet.title}: {changed_cells} cells changed in {len(updates)} ranges ({len(target)} rows)")
+    return {"rows": len(target), "changed_ranges": len(updates), "changed_cells": changed_cells}
+
+
+def sync_dataframe(worksheet, df: "pd.DataFrame", key_columns: Optional[Sequence[str]] = None) -> dict:
+    """
+    Diff `df` (plus its header row) against the worksheet and write only what changed.
+    With `key_columns`, rows are matched by key so inserts and deletes don't shift every row below them.
+    """
+    header = [str(to_cell(c)) for c in df.columns]
+    rows = [[to_cell(v) for v in row] for row in df.itertuples(index=False, name=None)]
+
+    current = scheduler.read(worksheet.get_all_values)
+    sheet_header = current[0][:len(header)] if current else []
+    if key_columns and len(sheet_header) == len(header) and all(map(same_cell, sheet_header, header)):
+        positions = [list(df.columns).index(k) for k in key_columns]
+        kinds = [key_kind(df.iloc[:, i]) for i in positions]
+        rows = order_like_sheet(current[1:], rows, positions, kinds)
+
+    return sync_rows(worksheet, [header] + rows, current=current)
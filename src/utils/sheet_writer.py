@@ -1,19 +1,11 @@
-import gspread, os
-from google.oauth2.service_account import Credentials
-from src.utils.credentials import get_credentials_with_retry
+from src.utils.sheets_client import sheets
+from src.utils.sheet_sync import sync_rows
 
 SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
 SHEET_ID = "1JW8mRPgOZ8xIgwq4EKvfd-uILPQCZCdfFgsJqDJ5Zmc"
 SHEET_NAME = "audios_count"
 
 def write_to_sheet(data: dict):
-    credentials = get_credentials_with_retry()
-    gc = gspread.authorize(credentials)
-    sheet = gc.open_by_key(SHEET_ID).worksheet(SHEET_NAME)
-
-    # Clear sheet first
-    sheet.clear()
-
     # ✅ Write headers (no subfolder columns)
     rows = [["Annotator", "Total Audio Files"]]
 
@@ -22,4 +14,5 @@ def write_to_sheet(data: dict):
         total = values.get("total_audio", 0)
         rows.append([annotator, total])
 
-    sheet.append_rows(rows, value_input_option="USER_ENTERED")
+    # Only the changed cells are sent
+    sheets.with_worksheet(SHEET_ID, SHEET_NAME, lambda ws: sync_rows(ws, rows), create=False)
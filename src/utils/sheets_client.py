@@ -0,0 +1,129 @@
+import os
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Callable
+from src.utils.credentials import get_credentials_with_retry
+from src.utils.lazy import lazy_import
+from src.utils.sheets_scheduler import scheduler, status_code
+
+gspread = lazy_import("gspread")
+gspread_exceptions = lazy_import("gspread.exceptions")
+
+# Opened Spreadsheet / Worksheet objects kept around between syncs
+HANDLE_CACHE_SIZE = int(os.getenv("SHEETS_HANDLE_CACHE_SIZE", "64"))
+
+
+def handle_gone(exc: BaseException) -> bool:
+    """True when a cached handle points at a tab or spreadsheet that was deleted or renamed."""
+    if isinstance(exc, gspread_exceptions.WorksheetNotFound):
+        return True
+    if isinstance(exc, gspread_exceptions.APIError):
+        # A missing spreadsheet is a 404; a missing tab shows up as an unparsable "'tab'!A1" range
+        return status_code(exc) == 404 or (status_code(exc) == 400 and "Unable to parse range" in str(exc))
+    return False
+
+
+class SheetsClientManager:
+    """
+    One authorized gspread client per process plus an LRU of opened spreadsheets and worksheets.
+    The client's AuthorizedSession refreshes the service-account token only once it has expired.
+    """
+
+    def __init__(self, max_handles: int = HANDLE_CACHE_SIZE):
+        self.max_handles = max_handles
+        self._lock = threading.RLock()
+        self._client = None
+        self._spreadsheets = OrderedDict()
+        self._worksheets = OrderedDict()
+        # One lock per handle being opened: API calls (and their rate-limit waits) never hold self._lock
+        self._opening = defaultdict(threading.Lock)
+
+    def client(self) -> "gspread.Client":
+        with self._lock:
+            if self._client is None:
+                self._client = gspread.authorize(get_credentials_with_retry())
+            return self._client
+
+    def _remember(self, cache: OrderedDict, key, value):
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > self.max_handles:
+            cache.popitem(last=False)
+        return value
+
+    def _cached(self, cache: OrderedDict, key):
+        with self._lock:
+            if key in cache:
+                cache.move_to_end(key)
+                return cache[key]
+        return None
+
+    def _opening_lock(self, key) -> threading.Lock:
+        with self._lock:
+            return self._opening[key]
+
+    def spreadsheet(self, sheet_id: str) -> "gspread.Spreadsheet":
+        spreadsheet = self._cached(self._spreadsheets, sheet_id)
+        if spreadsheet is not None:
+            return spreadsheet
+        # Concurrent lookups of the same spreadsheet open it once; other sheets aren't held up
+        with self._opening_lock(("spreadsheet", sheet_id)):
+            spreadsheet = self._cached(self._spreadsheets, sheet_id)
+            if spreadsheet is None:
+                spreadsheet = scheduler.read(self.client().open_by_key, sheet_id)
+                with self._lock:
+                    self._remember(self._spreadsheets, sheet_id, spreadsheet)
+            return spreadsheet
+
+    def worksheet(self, sheet_id: str, tab: str, create: bool = True, rows: str = "1000", cols: str = "20") -> "gspread.Worksheet":
+        """Cached (sheet_id, tab) worksheet, created with the given size when missing."""
+        key = (sheet_id, tab)
+        worksheet = self._cached(self._worksheets, key)
+        if worksheet is not None:
+            return worksheet
+
+        with self._opening_lock(("worksheet", key)):
+            worksheet = self._cached(self._worksheets, key)
+            if worksheet is not None:
+                return worksheet
+
+            spreadsheet = self.spreadsheet(sheet_id)
+            try:
+                worksheet = scheduler.read(spreadsheet.worksheet, tab)
+            except gspread_exceptions.WorksheetNotFound:
+                if not create:
+                    raise
+                worksheet = scheduler.write(spreadsheet.add_worksheet, title=tab, rows=rows, cols=cols)
+            with self._lock:
+                return self._remember(self._worksheets, key, worksheet)
+
+    def with_worksheet(self, sheet_id: str, tab: str, fn: Callable, create: bool = True, rows: str = "1000", cols: str = "20"):
+        """
+        fn(worksheet) on the cached handle. If the tab or spreadsheet went away since it was cached,
+        the handles are dropped and fn runs once more on freshly opened (or re-created) ones.
+        """
+        try:
+            return fn(self.worksheet(sheet_id, tab, create=create, rows=rows, cols=cols))
+        except Exception as e:
+            if not handle_gone(e):
+                raise
+            print(f"♻️ Sheet handle {sheet_id}/{tab} is stale ({e}), reopening")
+            self.invalidate(sheet_id, tab)
+            if isinstance(e, gspread_exceptions.APIError) and status_code(e) == 404:
+                self.invalidate(sheet_id)
+            return fn(self.worksheet(sheet_id, tab, create=create, rows=rows, cols=cols))
+
+    def invalidate(self, sheet_id: str = None, tab: str = None):
+        """Forget cached handles, e.g. after a tab was deleted or renamed on the sheet."""
+        with self._lock:
+            if sheet_id is None:
+                self._spreadsheets.clear()
+                self._worksheets.clear()
+                return
+            if tab is None:
+                self._spreadsheets.pop(sheet_id, None)
+            for key in [k for k in self._worksheets if k[0] == sheet_id and (tab is None or k[1] == tab)]:
+                del self._worksheets[key]
+
+
+sheets = SheetsClientManager()
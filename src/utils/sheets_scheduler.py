@@ -0,0 +1,162 @@
+import os
+import time
+import random
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, List
+from src.utils.lazy import lazy_import
+from src.utils.rate_limit import TokenBucket
+
+gspread_exceptions = lazy_import("gspread.exceptions")
+gspread_utils = lazy_import("gspread.utils")
+
+# Per-user Sheets API quotas (requests per minute); the service account is a single user
+READS_PER_MINUTE = float(os.getenv("SHEETS_READS_PER_MINUTE", "60"))
+WRITES_PER_MINUTE = float(os.getenv("SHEETS_WRITES_PER_MINUTE", "60"))
+
+MAX_ATTEMPTS = int(os.getenv("SHEETS_MAX_ATTEMPTS", "6"))
+# Cap on cells merged into one coalesced values.batchUpdate request
+MAX_COALESCED_CELLS = 100_000
+
+
+def status_code(exc: "gspread_exceptions.APIError") -> int:
+    try:
+        return exc.response.status_code
+    except AttributeError:
+        return getattr(exc, "code", 0)
+
+
+def _rejected(exc: Exception) -> bool:
+    """A 4xx other than 429: something in the request itself is wrong, retrying it as is won't help."""
+    if not isinstance(exc, gspread_exceptions.APIError):
+        return False
+    status = status_code(exc)
+    return 400 <= status < 500 and status != 429
+
+
+class _PendingUpdate:
+    def __init__(self, data: List[dict]):
+        self.data = data
+        self.cells = sum(len(d["values"]) * max((len(r) for r in d["values"]), default=0) for d in data)
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SheetsScheduler:
+    """
+    Every Sheets API call goes through here. Reads and writes draw from separate token buckets
+    sized to the per-minute quota. Value writes bound for the same spreadsheet are coalesced into
+    one values.batchUpdate while they wait for a token; if the merged request is rejected, each
+    caller's updates are resent separately. A 429 halves the rate for everybody
+    (instead of each caller retrying on its own timer), and successes ramp it back up.
+    """
+
+    def __init__(self, reads_per_minute: float = READS_PER_MINUTE, writes_per_minute: float = WRITES_PER_MINUTE):
+        self.buckets = {
+            "read": TokenBucket(reads_per_minute),
+            "write": TokenBucket(writes_per_minute),
+        }
+        self._pending: Dict[str, List[_PendingUpdate]] = defaultdict(list)
+        self._pending_lock = threading.Lock()
+        self._flush_locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+
+    def call(self, kind: str, fn: Callable, *args, acquired: bool = False, **kwargs):
+        """Run one API call under the `kind` ("read"/"write") quota, retrying 429s and 5xx errors."""
+        bucket = self.buckets[kind]
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            if not acquired:
+                bucket.acquire()
+            acquired = False
+            try:
+                result = fn(*args, **kwargs)
+                bucket.speed_up()
+                return result
+            except gspread_exceptions.APIError as e:
+                status = status_code(e)
+                if attempt == MAX_ATTEMPTS or not (status == 429 or status >= 500):
+                    raise
+                if status == 429:
+                    bucket.slow_down()
+                    print(f"⏳ Sheets {kind} quota hit, slowing to {bucket.rate_per_minute:.0f}/min")
+                # Full jitter so callers that failed together don't retry together
+                time.sleep(random.uniform(0, min(30, 2 ** attempt)))
+
+    def read(self, fn: Callable, *args, **kwargs):
+        return self.call("read", fn, *args, **kwargs)
+
+    def write(self, fn: Callable, *args, **kwargs):
+        return self.call("write", fn, *args, **kwargs)
+
+    def update_values(self, worksheet, updates: List[dict]):
+        """
+        Queue {"range", "values"} updates for `worksheet` and block until they are written.
+        Updates for the same spreadsheet queued by other threads go out in the same request.
+        """
+        spreadsheet = worksheet.spreadsheet
+        entry = _PendingUpdate([
+            {"range": gspread_utils.absolute_range_name(worksheet.title, u["range"]), "values": u["values"]}
+            for u in updates
+        ])
+        with self._pending_lock:
+            self._pending[spreadsheet.id].append(entry)
+
+        while not entry.done.is_set():
+            self._flush(spreadsheet, entry)
+
+        if entry.error:
+            raise entry.error
+        return entry.result
+
+    def _flush(self, spreadsheet, entry: _PendingUpdate):
+        with self._flush_locks[spreadsheet.id]:
+            if entry.done.is_set():
+                # The previous leader took our update along
+                return
+
+            # Wait for the token first so everything queued meanwhile rides along
+            self.buckets["write"].acquire()
+
+            with self._pending_lock:
+                queue = self._pending[spreadsheet.id]
+                batch, cells = [], 0
+                while queue and (not batch or cells + queue[0].cells <= MAX_COALESCED_CELLS):
+                    cells += queue[0].cells
+                    batch.append(queue.pop(0))
+
+            if not batch:
+                self.buckets["write"].release()
+                return
+
+            body = {"valueInputOption": "USER_ENTERED", "data": [d for pending in batch for d in pending.data]}
+            try:
+                result = self.call("write", spreadsheet.values_batch_update, body, acquired=True)
+            except Exception as e:
+                if len(batch) > 1 and _rejected(e):
+                    # One bad range (e.g. a renamed or deleted tab) fails the whole request: send each
+                    # caller's updates on their own so only the owner of the bad range gets the error
+                    self._write_each(spreadsheet, batch)
+                    return
+                for pending in batch:
+                    pending.error = e
+                    pending.done.set()
+                return
+
+            if len(batch) > 1:
+                print(f"🧩 Coalesced {len(batch)} sheet updates into one request for {spreadsheet.id}")
+            for pending in batch:
+                pending.result = result
+                pending.done.set()
+
+    def _write_each(self, spreadsheet, batch: List[_PendingUpdate]):
+        for pending in batch:
+            try:
+                body = {"valueInputOption": "USER_ENTERED", "data": pending.data}
+                pending.result = self.call("write", spreadsheet.values_batch_update, body)
+            except Exception as e:
+                pending.error = e
+            finally:
+                pending.done.set()
+
+
+scheduler = SheetsScheduler()
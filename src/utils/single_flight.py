@@ -0,0 +1,94 @@
+import asyncio
+import functools
+import inspect
+import threading
+from typing import Callable, Dict, Hashable, Optional
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls sharing a key into one execution whose result (or exception) every
+    caller receives. Nothing is cached: the next call after it finishes runs again.
+    Threads use do(), coroutines do_async(); the two don't wait on each other.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key: Hashable, fn: Callable, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        task_key = (id(loop), key)
+        task = self._tasks.get(task_key)
+        if task is None:
+            task = loop.create_task(fn(*args, **kwargs))
+            self._tasks[task_key] = task
+            task.add_done_callback(functools.partial(self._task_done, task_key))
+        # One caller going away must not cancel the call the others are waiting on
+        return await asyncio.shield(task)
+
+    def _task_done(self, task_key, task: asyncio.Task):
+        if self._tasks.get(task_key) is task:
+            del self._tasks[task_key]
+        if not task.cancelled():
+            task.exception()  # retrieved here in case every caller was cancelled
+
+
+flights = SingleFlight()
+
+
+def single_flight(key: Optional[Callable[..., Hashable]] = None, group: SingleFlight = flights):
+    """
+    Decorator: concurrent calls of the function with the same arguments (or the same `key(*args, **kwargs)`)
+    share one execution. Works on plain and async functions; results are shared, so return immutable data.
+    """
+    def decorator(func):
+        def make_key(args, kwargs):
+            return (func.__qualname__, key(*args, **kwargs) if key else (args, tuple(sorted(kwargs.items()))))
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                return await group.do_async(make_key(args, kwargs), func, *args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return group.do(make_key(args, kwargs), func, *args, **kwargs)
+        return wrapper
+
+    return decorator
@@ -0,0 +1,186 @@
+import os
+import json
+import shutil
+import hashlib
+import threading
+from datetime import date, datetime, time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+from src.utils.lazy import lazy_import
+from src.utils.repo_events import on_repo_update, touches
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Arrow IPC snapshots of parsed report artifacts, one folder per (artifact, parser, content hash)
+SNAPSHOT_DIR = Path(os.getenv("SNAPSHOT_DIR", ".cache/snapshots")).resolve()
+# Versions of each artifact kept on disk (the current one plus a previous one by default)
+SNAPSHOTS_KEPT = int(os.getenv("SNAPSHOTS_KEPT", "2"))
+SNAPSHOTS_ENABLED = os.getenv("SNAPSHOTS", "on").lower() not in ("off", "0", "false")
+
+LABELS_KEY = b"snapshot:columns"
+NAME_KEY = b"snapshot:name"
+
+Parser = Callable[[bytes], Dict[str, "pd.DataFrame"]]
+
+_pyarrow = None
+_unsupported = set()
+# artifact path -> (parser, variant), converted in the background when a push touches it
+_artifacts: Dict[str, tuple] = {}
+
+
+def _arrow():
+    """pyarrow is optional: without it every read simply parses the source file."""
+    global _pyarrow
+    if _pyarrow is None:
+        try:
+            import pyarrow
+            import pyarrow.ipc  # noqa: F401
+            _pyarrow = pyarrow
+        except ImportError:
+            print("⚠️ pyarrow is not installed, parsed reports won't be snapshotted")
+            _pyarrow = False
+    return _pyarrow or None
+
+
+# Arrow column names must be strings; xlsx headers are often timestamps or numbers, so the
+# original labels travel in the schema metadata and are restored on load.
+def _encode_label(label):
+    if isinstance(label, str):
+        return ["str", label]
+    if isinstance(label, (bool, np.bool_)):
+        return ["bool", bool(label)]
+    if isinstance(label, (int, np.integer)):
+        return ["int", int(label)]
+    if isinstance(label, (float, np.floating)):
+        return ["float", float(label)]
+    if isinstance(label, pd.Timestamp):
+        return ["timestamp", label.isoformat()]
+    if isinstance(label, datetime):
+        return ["datetime", label.isoformat()]
+    if isinstance(label, date):
+        return ["date", label.isoformat()]
+    if isinstance(label, time):
+        return ["time", label.isoformat()]
+    raise TypeError(f"unsupported column label {label!r}")
+
+
+def _decode_label(encoded):
+    kind, value = encoded
+    if kind == "timestamp":
+        return pd.Timestamp(value)
+    if kind == "datetime":
+        return datetime.fromisoformat(value)
+    if kind == "date":
+        return date.fromisoformat(value)
+    if kind == "time":
+        return time.fromisoformat(value)
+    return value
+
+
+def _slug(artifact: str) -> str:
+    return "".join(c if c.isalnum() or c in "-_." else "__" for c in artifact)
+
+
+def _write(folder: Path, frames: Dict[str, "pd.DataFrame"]):
+    pa = _arrow()
+    tmp = folder.with_name(f"{folder.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+    tmp.mkdir(parents=True, exist_ok=True)
+    try:
+        for i, (name, df) in enumerate(frames.items()):
+            labels = [_encode_label(c) for c in df.columns]
+            flat = df.set_axis([f"c{n}" for n in range(df.shape[1])], axis=1)
+            table = pa.Table.from_pandas(flat)
+            metadata = {**(table.schema.metadata or {}), LABELS_KEY: json.dumps(labels).encode(), NAME_KEY: json.dumps(name).encode()}
+            table = table.replace_schema_metadata(metadata)
+            # Uncompressed IPC file so loads can memory-map it instead of decoding
+            with pa.OSFile(str(tmp / f"{i}.arrow"), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        try:
+            os.replace(tmp, folder)
+        except OSError:
+            pass  # another worker finished the same snapshot first
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _read(folder: Path) -> Dict[str, "pd.DataFrame"]:
+    pa = _arrow()
+    frames = {}
+    for path in sorted(folder.glob("*.arrow"), key=lambda p: int(p.stem)):
+        table = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+        metadata = table.schema.metadata
+        df = table.to_pandas()
+        df.columns = [_decode_label(label) for label in json.loads(metadata[LABELS_KEY])]
+        # Arrow nulls come back as None in object columns; the parsers produced NaN there
+        for col in df.columns[df.dtypes == object]:
+            if df[col].isna().any():
+                df[col] = df[col].where(df[col].notna(), np.nan)
+        frames[json.loads(metadata[NAME_KEY])] = df
+    return frames
+
+
+def _prune(artifact_dir: Path, variant: str, keep: Path):
+    versions = sorted(
+        (p for p in artifact_dir.glob(f"{variant}-*") if p.is_dir() and not p.name.endswith(".tmp")),
+        key=lambda p: p.stat().st_mtime, reverse=True,
+    )
+    for old in [p for p in versions if p != keep][max(0, SNAPSHOTS_KEPT - 1):]:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+def load_frames(artifact: str, content: bytes, parse: Parser, variant: str = "default", digest: Optional[str] = None) -> Dict[str, "pd.DataFrame"]:
+    """
+    parse(content) once per content hash, then serve the frames from a memory-mapped Arrow snapshot.
+    `artifact` is the repo-relative path (e.g. "reports/audio_data_summary.xlsx") and `variant` names
+    the parser, so different readings of the same file don't share a snapshot. Every call returns
+    fresh DataFrames.
+    """
+    if not SNAPSHOTS_ENABLED or _arrow() is None:
+        return parse(content)
+
+    digest = digest or hashlib.sha256(content).hexdigest()
+    artifact_dir = SNAPSHOT_DIR / _slug(artifact)
+    folder = artifact_dir / f"{variant}-{digest[:32]}"
+
+    if folder.is_dir():
+        try:
+            return _read(folder)
+        except Exception as e:
+            print(f"⚠️ Discarding unreadable snapshot {folder}: {e}")
+            shutil.rmtree(folder, ignore_errors=True)
+
+    frames = parse(content)
+    if folder in _unsupported:
+        return frames
+    try:
+        _write(folder, frames)
+        _prune(artifact_dir, variant, folder)
+    except Exception as e:
+        # e.g. mixed-type object columns Arrow can't represent; keep parsing this version instead
+        print(f"⚠️ Could not snapshot {artifact}: {e}")
+        _unsupported.add(folder)
+    return frames
+
+
+def register_artifact(artifact: str, parse: Parser, variant: str = "default"):
+    """Snapshot `artifact` in the background as soon as a push changes it, ahead of the first reader."""
+    _artifacts[artifact] = (parse, variant)
+
+
+def _convert(artifact: str, parse: Parser, variant: str):
+    from src.utils.report_source import get_report_source
+    try:
+        load_frames(artifact, get_report_source().read_bytes(artifact), parse, variant)
+        print(f"🧊 Snapshotted {artifact}")
+    except Exception as e:
+        print(f"⚠️ Could not snapshot {artifact}: {e}")
+
+
+@on_repo_update
+def snapshot_changed_artifacts(paths):
+    if not SNAPSHOTS_ENABLED or _arrow() is None:
+        return
+    for artifact, (parse, variant) in _artifacts.items():
+        if touches(paths, artifact):
+            threading.Thread(target=_convert, args=(artifact, parse, variant), daemon=True).start()
@@ -1,9 +1,12 @@
 import hmac
 import hashlib
 import json, os
-import requests
 
 from dotenv import load_dotenv
+from src.utils.lazy import lazy_import
+
+requests = lazy_import("requests")
+
 load_dotenv()
 
 URL = os.environ.get("WEBSITE_URL")